@@ -1,16 +1,24 @@
+from datetime import date, time
 from typing import Literal
 
 from django.db.models import Count, Q
+from django.db.models.functions import Trunc
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils.timezone import datetime, timedelta
+from django.utils.timezone import datetime, timedelta, utc
 from ninja import Router
+from ninja.errors import HttpError
 
-from schemas import PaginatedList, paginate
+from schemas import PaginatedList, cursor_paginate, paginate
 
-from . import models, schemas, services
+from . import models, schemas, search, services, throttle
+from .cache import cached_response, stock_id
 
 router = Router()
 
+# Newest first, with the primary key breaking ties between equal timestamps
+FEED_ORDER = ["-timestamp", "-pk"]
+
 
 @router.get("/stock", response=PaginatedList[schemas.Stock])
 def get_stocks(request, page: int = 1, limit: int = 10):
@@ -20,6 +28,22 @@ def get_stocks(request, page: int = 1, limit: int = 10):
 
 @router.get("/stock/search", response=PaginatedList[schemas.StockStub])
 def get_stock_search(request, q: str = None, page: int = 1, limit: int = 10):
+    if q:
+        # Only the matches up to the requested page are ranked, which lets the
+        # index stop early, so the total number of matches is not known
+        page = max(page, 1)
+        matches = search.get_index().search(q, limit=page * limit)
+        if matches:
+            return PaginatedList(
+                items=[
+                    schemas.StockStub.from_orm(match)
+                    for match in matches[(page - 1) * limit :]
+                ],
+                limit=limit,
+                total=None,
+                page=page,
+                pages=None,
+            )
     results = models.Stock.objects.all()
     if q:
         results = results.fuzzy_search(q)
@@ -29,12 +53,14 @@ def get_stock_search(request, q: str = None, page: int = 1, limit: int = 10):
 
 
 @router.get("/stock/{str:ticker}", response=schemas.Stock)
+@cached_response
 def get_stock(request, ticker: str):
     stock = get_object_or_404(models.Stock, ticker=ticker)
     return schemas.Stock.from_orm(stock)
 
 
 @router.get("/stock/{str:ticker}/price", response=list[schemas.Price])
+@cached_response
 def get_stock_price(request, ticker: str):
     results = models.Price.objects.filter(
         stock__ticker=ticker, timestamp__gte=datetime.now() - timedelta(days=365)
@@ -42,55 +68,179 @@ def get_stock_price(request, ticker: str):
     return [schemas.Price.from_orm(price) for price in results]
 
 
+@router.get("/stock/{str:ticker}/price/series", response=schemas.PriceSeries)
+@cached_response
+def get_stock_price_series(
+    request,
+    ticker: str,
+    start: date = None,
+    end: date = None,
+    interval: Literal["day", "week", "month"] = "day",
+    format: Literal["json", "float64", "arrow"] = "json",
+):
+    # Both dates are inclusive, so the range ends at the midnight after `end`
+    end = (
+        datetime.combine(end + timedelta(days=1), time(), utc)
+        if end
+        else datetime.now(utc)
+    )
+    start = datetime.combine(start, time(), utc) if start else end - timedelta(days=365)
+    results = schemas.PriceSeries.from_values(
+        services.get_price_series(stock_id(ticker), start, end, interval)
+    )
+    if format == "float64":
+        return HttpResponse(
+            results.to_float64(), content_type="application/octet-stream"
+        )
+    if format == "arrow":
+        try:
+            content = results.to_arrow()
+        except ImportError:
+            raise HttpError(406, "Arrow output requires pyarrow")
+        return HttpResponse(content, content_type="application/vnd.apache.arrow.stream")
+    return results
+
+
 @router.get("/stock/{str:ticker}/reddit", response=PaginatedList[schemas.Reddit])
-def get_stock_reddit(request, ticker: str, page: int = 1, limit: int = 10):
-    results = models.Reddit.objects.filter(stock__ticker=ticker)
-    return paginate(results, schemas.Reddit, page, limit)
+@cached_response
+def get_stock_reddit(
+    request,
+    ticker: str,
+    page: int = 1,
+    limit: int = 10,
+    cursor: str = None,
+    total: Literal["exact", "approximate", "none"] = "none",
+):
+    results = models.Reddit.objects.filter(stock_id=stock_id(ticker))
+    if cursor is not None:
+        return cursor_paginate(
+            results, schemas.Reddit, cursor, limit, FEED_ORDER, total=total
+        )
+    return paginate(results, schemas.Reddit, page, limit, FEED_ORDER)
 
 
 @router.get("/stock/{str:ticker}/tweets", response=PaginatedList[schemas.Tweet])
-def get_stock_tweets(request, ticker: str, page: int = 1, limit: int = 10):
-    results = models.Tweet.objects.filter(stock__ticker=ticker)
-    return paginate(results, schemas.Tweet, page, limit)
+@cached_response
+def get_stock_tweets(
+    request,
+    ticker: str,
+    page: int = 1,
+    limit: int = 10,
+    cursor: str = None,
+    total: Literal["exact", "approximate", "none"] = "none",
+):
+    results = models.Tweet.objects.filter(stock_id=stock_id(ticker))
+    if cursor is not None:
+        return cursor_paginate(
+            results, schemas.Tweet, cursor, limit, FEED_ORDER, total=total
+        )
+    return paginate(results, schemas.Tweet, page, limit, FEED_ORDER)
 
 
 @router.get("/stock/{str:ticker}/news", response=PaginatedList[schemas.News])
-def get_stock_news(request, ticker: str, page: int = 1, limit: int = 10):
-    results = models.News.objects.filter(stock__ticker=ticker)
-    return paginate(results, schemas.News, page, limit)
+@cached_response
+def get_stock_news(
+    request,
+    ticker: str,
+    page: int = 1,
+    limit: int = 10,
+    cursor: str = None,
+    total: Literal["exact", "approximate", "none"] = "none",
+):
+    results = models.News.objects.filter(stock_id=stock_id(ticker))
+    if cursor is not None:
+        return cursor_paginate(
+            results, schemas.News, cursor, limit, FEED_ORDER, total=total
+        )
+    return paginate(results, schemas.News, page, limit, FEED_ORDER)
 
 
 @router.get("/stock/{str:ticker}/indicators", response=list[schemas.Indicator])
+@cached_response
 def get_stock_indicators(request, ticker: str):
     results = models.Indicator.objects.filter(stock__ticker=ticker)
     return [schemas.Indicator.from_orm(price) for price in results]
 
 
+@router.get("/stock/{str:ticker}/indicators/series", response=schemas.IndicatorSeries)
+@cached_response
+def get_stock_indicator_series(request, ticker: str):
+    results = (
+        models.IndicatorValue.objects.filter(
+            stock__ticker=ticker,
+            timestamp__gte=datetime.now() - timedelta(days=365),
+        )
+        .order_by("timestamp")
+        .values_list(*schemas.IndicatorSeries.__fields__)
+    )
+    return schemas.IndicatorSeries.from_values(results)
+
+
 @router.get("/stock/{str:ticker}/sentiment", response=list[schemas.PieValue])
+@cached_response
 def get_stock_sentiment(
     request, ticker: str, q: Literal["tweet", "reddit", "news"] = "tweet"
 ):
+    results = models.SentimentTotal.objects.filter(
+        stock__ticker=ticker, source=q
+    ).first()
+
+    return [
+        schemas.PieValue(key=key, value=getattr(results, key, 0))
+        for key in ["positive", "neutral", "negative"]
+    ]
 
+
+@router.get("/stock/{str:ticker}/sentiment/series", response=schemas.SentimentSeries)
+@cached_response
+def get_stock_sentiment_series(
+    request,
+    ticker: str,
+    source: Literal["tweet", "reddit", "news"] = "tweet",
+    bucket: Literal["hour", "day", "week"] = "day",
+):
     results = (
-        models.Stock.objects.filter(ticker=ticker)
+        services.SENTIMENT_SOURCES[source]
+        .objects.filter(stock_id=stock_id(ticker))
+        .annotate(bucket=Trunc("timestamp", bucket))
+        .values("bucket")
         .annotate(
-            negative=Count(
-                f"{q}__sentiment",
-                filter=Q(**{f"{q}__sentiment": models.SentimentChoices.NEGATIVE}),
-            ),
-            positive=Count(
-                f"{q}__sentiment",
-                filter=Q(**{f"{q}__sentiment": models.SentimentChoices.POSITIVE}),
-            ),
-            neutral=Count(
-                f"{q}__sentiment",
-                filter=Q(**{f"{q}__sentiment": models.SentimentChoices.NEUTRAL}),
-            ),
+            **{
+                sentiment: Count("pk", filter=Q(sentiment=sentiment))
+                for sentiment in ["positive", "negative", "neutral"]
+            }
         )
-        .first()
+        .order_by("bucket")
+        .values_list("bucket", "positive", "negative", "neutral")
     )
+    return schemas.SentimentSeries.from_values(results)
+
+
+@router.get("/stock/{str:ticker}/jobs", response=list[schemas.Job])
+def get_stock_jobs(request, ticker: str):
+    results = models.Job.objects.filter(stock__ticker=ticker).order_by("-created_at")
+    return [schemas.Job.from_orm(job) for job in results]
 
+
+@router.get("/jobs/{int:job_id}", response=schemas.Job)
+def get_job(request, job_id: int):
+    job = get_object_or_404(models.Job, pk=job_id)
+    return schemas.Job.from_orm(job)
+
+
+@router.get("/metrics/sentiment-cache", response=schemas.CacheStats)
+def get_sentiment_cache_stats(request):
+    return schemas.CacheStats(**services.get_sentiment_cache().info())
+
+
+@router.get("/metrics/ticker-lookups", response=schemas.TickerLookupStats)
+def get_ticker_lookup_stats(request):
+    return schemas.TickerLookupStats(**services.get_ticker_lookups().info())
+
+
+@router.get("/metrics/rate-limits", response=list[schemas.RateLimitStats])
+def get_rate_limit_stats(request):
     return [
-        schemas.PieValue(key=key, value=getattr(results, key))
-        for key in ["positive", "neutral", "negative"]
+        schemas.RateLimitStats(provider=provider, **stats)
+        for provider, stats in throttle.info().items()
     ]
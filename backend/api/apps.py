@@ -8,5 +8,6 @@ class ApiConfig(AppConfig):
     def ready(self):
         super().ready()
 
-        # Implicitly connect a signal handlers decorated with @receiver.
-        from . import signals  # noqa: F401
+        # Implicitly connect signal handlers decorated with @receiver and
+        # register tasks decorated with @task.
+        from . import signals, tasks  # noqa: F401
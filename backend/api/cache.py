@@ -0,0 +1,81 @@
+import hashlib
+import time
+from functools import wraps
+from typing import Optional
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from ninja.responses import Response
+
+from dataprod.config import Config, config
+
+from . import models
+
+config: Config
+
+_stock_ids: dict[str, int] = {}
+
+
+def _version(key: str) -> int:
+    # Versions are timestamps rather than counters so that an evicted version
+    # key can never be recreated with a value older entries were stored under.
+    return cache.get_or_set(key, time.time_ns, timeout=None)
+
+
+def response_key(request, ticker: str) -> str:
+    params = sorted(request.GET.lists())
+    version = f"{_version('response:version')}:{_version(f'response:{ticker}:version')}"
+    return f"response:{ticker}:{version}:{request.path}:{params}"
+
+
+def invalidate(ticker: Optional[str] = None):
+    """Invalidates every cached response for `ticker`, or for all stocks."""
+    key = f"response:{ticker}:version" if ticker else "response:version"
+    cache.set(key, time.time_ns(), timeout=None)
+
+
+def stock_id(ticker: str) -> Optional[int]:
+    """Resolves a ticker to its stock's primary key, remembering it for the
+    lifetime of the process so feed queries can filter on `stock_id` without
+    joining `Stock`. Unknown tickers are not remembered."""
+    if ticker not in _stock_ids:
+        pk = models.Stock.objects.filter(ticker=ticker).values_list("pk", flat=True)
+        if not pk:
+            return None
+        _stock_ids[ticker] = pk[0]
+    return _stock_ids[ticker]
+
+
+def forget_stock_id(ticker: str):
+    _stock_ids.pop(ticker, None)
+
+
+def cached_response(view):
+    """Caches the rendered body of a read-only view taking a `ticker` path
+    parameter, keyed by ticker and query parameters. Views may return a schema,
+    rendered as JSON, or an HttpResponse for other content types. Responses
+    carry an ETag so clients can revalidate with If-None-Match and receive a 304."""
+
+    @wraps(view)
+    def wrapper(request, ticker: str, **kwargs):
+        key = response_key(request, ticker)
+        entry = cache.get(key)
+        if entry is None:
+            result = view(request, ticker=ticker, **kwargs)
+            if not isinstance(result, HttpResponse):
+                result = Response(result)
+            content = result.content
+            etag = f'"{hashlib.sha1(content).hexdigest()}"'
+            entry = (content, etag, result["Content-Type"])
+            cache.set(key, entry, timeout=config.cache_timeout)
+
+        content, etag, content_type = entry
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        patch_cache_control(response, max_age=0, must_revalidate=True)
+        return response
+
+    return wrapper
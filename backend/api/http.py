@@ -0,0 +1,91 @@
+import logging
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from dataprod.config import Config, config
+
+from . import throttle
+
+config: Config
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: quota exhausted or a transient server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Session(requests.Session):
+    """Session with a default timeout and a keep-alive connection pool per host,
+    so repeated calls to the same API skip the TCP and TLS handshakes."""
+
+    def __init__(self, timeout: float, pool_size: int):
+        super().__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(*args, **kwargs)
+
+
+_session = None
+
+
+def get_session() -> Session:
+    """Returns the process-wide session, created on first use. It is safe to
+    share between threads."""
+    global _session
+    if _session is None:
+        _session = Session(config.http_timeout, config.http_pool_size)
+    return _session
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+def get(provider: str, url: str, **kwargs) -> requests.Response:
+    """Sends a GET request within a provider's rate limit, retrying with
+    exponential backoff on 429s, 5xx responses and connection errors.
+
+    Args:
+        provider (str): Name of the external API, which selects its rate limiter
+        url (str): URL to fetch
+
+    Returns:
+        requests.Response: The first non-retryable response, or the last one
+            once retries are exhausted
+    """
+    limiter = throttle.get_limiter(provider)
+    for attempt in range(config.http_max_retries + 1):
+        last = attempt == config.http_max_retries
+        delay = config.http_backoff * 2**attempt
+        limiter.acquire()
+        try:
+            response = get_session().get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if last:
+                raise
+            logger.warning("%s request failed, retrying in %ss", provider, delay)
+        else:
+            limiter.record(rejected=response.status_code == 429)
+            if response.status_code not in RETRY_STATUSES or last:
+                return response
+            # Honour the provider's own estimate of when the quota resets
+            delay = retry_after(response) or delay
+            logger.warning(
+                "%s responded %s, retrying in %ss",
+                provider,
+                response.status_code,
+                delay,
+            )
+        limiter.record(retried=True)
+        time.sleep(delay)
@@ -0,0 +1,352 @@
+"""Technical indicators computed for many stocks at once.
+
+Close prices are loaded into a (stocks x bars) matrix, right-aligned so that
+the latest bar of every stock shares the last column and shorter histories
+are padded with NaN on the left. Each indicator is then a handful of NumPy
+operations over the whole matrix, matching the `ta` library with
+`fillna=False`.
+
+A full computation also snapshots the running state of every indicator into
+IndicatorState, which `append_bars` advances one bar at a time so that daily
+updates do not re-read the price history. Both paths store the indicator
+values of every bar in IndicatorValue for charting.
+"""
+import math
+from typing import Iterable, Optional
+
+import numpy as np
+from django.db import transaction
+
+from . import models
+
+SMA_WINDOWS = (50, 100, 200)
+EMA_WINDOWS = (12, 26, 50, 100, 200)
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_WINDOW = 14
+
+
+def load_closes(stock_ids: Optional[Iterable[int]] = None):
+    """Loads the close prices of the given stocks (or all stocks) in one query.
+
+    Returns:
+        tuple[list[int], list[tuple[datetime]], np.ndarray]: Stock ids, the
+            timestamps of their bars and their right-aligned close price matrix
+    """
+    prices = models.Price.objects.order_by("stock_id", "timestamp")
+    if stock_ids is not None:
+        prices = prices.filter(stock_id__in=list(stock_ids))
+    rows = list(prices.values_list("stock_id", "timestamp", "close"))
+    if not rows:
+        return [], [], np.empty((0, 0))
+    stock_id, timestamp, close = zip(*rows)
+    stock_id = np.array(stock_id, dtype=int)
+
+    ids, starts, counts = np.unique(stock_id, return_index=True, return_counts=True)
+    closes = np.full((len(ids), counts.max(initial=0)), np.nan)
+    # Column of each row within its stock's right-aligned history
+    columns = np.arange(len(stock_id)) - np.repeat(starts, counts)
+    columns += np.repeat(closes.shape[1] - counts, counts)
+    closes[np.repeat(np.arange(len(ids)), counts), columns] = np.array(
+        close, dtype=float
+    )
+    timestamps = [timestamp[i : i + n] for i, n in zip(starts, counts)]
+    return ids.tolist(), timestamps, closes
+
+
+def mask(values: np.ndarray, counts: np.ndarray, min_periods: int) -> np.ndarray:
+    return np.where(counts >= min_periods, values, np.nan)
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    counts[:, window:] = counts[:, window:] - counts[:, :-window]
+    return mask(sums / window, counts, window)
+
+
+def ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponentially weighted mean equivalent to pandas' `ewm(adjust=False)`,
+    starting from each row's first non-NaN value. Callers apply `min_periods`
+    with `mask`."""
+    out = np.full(values.shape, np.nan)
+    state = np.full(values.shape[0], np.nan)
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        state = np.where(
+            np.isnan(x),
+            state,
+            np.where(np.isnan(state), x, alpha * x + (1 - alpha) * state),
+        )
+        out[:, t] = state
+    return out
+
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    counts = np.cumsum(~np.isnan(values), axis=1)
+    return mask(ewm(values, 2 / (window + 1)), counts, window)
+
+
+def rsi_directions(closes: np.ndarray):
+    diff = np.full(closes.shape, np.nan)
+    diff[:, 1:] = closes[:, 1:] - closes[:, :-1]
+    # Like `ta`, the first bar of each history counts as no change
+    padding = np.isnan(closes)
+    up = np.where(padding, np.nan, np.where(diff > 0, diff, 0.0))
+    down = np.where(padding, np.nan, np.where(diff < 0, -diff, 0.0))
+    return up, down
+
+
+def relative_strength(avg_up, avg_down):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(avg_down == 0, 100, 100 - 100 / (1 + avg_up / avg_down))
+
+
+def compute(closes: np.ndarray):
+    """Computes the full series of every indicator for a close price matrix,
+    along with the running state after the last bar.
+
+    Returns:
+        tuple[dict[str, np.ndarray], dict[str, np.ndarray]]: Indicator series and
+            state arrays, both keyed by name
+    """
+    counts = np.cumsum(~np.isnan(closes), axis=1)
+    raw = {w: ewm(closes, 2 / (w + 1)) for w in EMA_WINDOWS}
+
+    series = {}
+    for window in SMA_WINDOWS:
+        series[f"sma_{window}"] = sma(closes, window)
+        series[f"ema_{window}"] = mask(raw[window], counts, window)
+
+    macd = mask(raw[MACD_FAST], counts, MACD_FAST) - mask(
+        raw[MACD_SLOW], counts, MACD_SLOW
+    )
+    signal = ewm(macd, 2 / (MACD_SIGNAL + 1))
+    series["macd_diff"] = macd - mask(
+        signal, np.cumsum(~np.isnan(macd), axis=1), MACD_SIGNAL
+    )
+
+    up, down = rsi_directions(closes)
+    rsi_up = ewm(up, 1 / RSI_WINDOW)
+    rsi_down = ewm(down, 1 / RSI_WINDOW)
+    series["rsi"] = relative_strength(
+        mask(rsi_up, counts, RSI_WINDOW), mask(rsi_down, counts, RSI_WINDOW)
+    )
+
+    state = dict(
+        bars=counts[:, -1],
+        closes=closes[:, -max(SMA_WINDOWS) :],
+        **{f"sma_{w}_sum": np.nansum(closes[:, -w:], axis=1) for w in SMA_WINDOWS},
+        **{f"ema_{w}": raw[w][:, -1] for w in EMA_WINDOWS},
+        macd_signal=signal[:, -1],
+        macd_diff=series["macd_diff"][:, -1],
+        rsi_up=rsi_up[:, -1],
+        rsi_down=rsi_down[:, -1],
+    )
+    return series, state
+
+
+def advance(state: models.IndicatorState, close: float) -> dict[str, float]:
+    """Folds one new bar into a stock's indicator state in O(1).
+
+    Returns:
+        dict[str, float]: The value of every indicator at the new bar
+    """
+    closes = state.closes
+    previous = closes[-1] if closes else math.nan
+    for w in SMA_WINDOWS:
+        dropped = closes[-w] if len(closes) >= w else 0.0
+        setattr(state, f"sma_{w}_sum", getattr(state, f"sma_{w}_sum") + close - dropped)
+    state.closes = (closes + [close])[-max(SMA_WINDOWS) :]
+    state.bars += 1
+
+    for w in EMA_WINDOWS:
+        value = getattr(state, f"ema_{w}")
+        alpha = 2 / (w + 1)
+        setattr(
+            state,
+            f"ema_{w}",
+            close if math.isnan(value) else alpha * close + (1 - alpha) * value,
+        )
+
+    values = {}
+    for w in SMA_WINDOWS:
+        ready = state.bars >= w
+        values[f"sma_{w}"] = getattr(state, f"sma_{w}_sum") / w if ready else math.nan
+        values[f"ema_{w}"] = getattr(state, f"ema_{w}") if ready else math.nan
+
+    if state.bars >= MACD_SLOW:
+        macd = state.ema_12 - state.ema_26
+        alpha = 2 / (MACD_SIGNAL + 1)
+        state.macd_signal = (
+            macd
+            if math.isnan(state.macd_signal)
+            else alpha * macd + (1 - alpha) * state.macd_signal
+        )
+        ready = state.bars >= MACD_SLOW + MACD_SIGNAL - 1
+        state.macd_diff = macd - state.macd_signal if ready else math.nan
+    values["macd_diff"] = state.macd_diff
+
+    diff = 0.0 if math.isnan(previous) else close - previous
+    alpha = 1 / RSI_WINDOW
+    for name, move in (("rsi_up", max(diff, 0.0)), ("rsi_down", max(-diff, 0.0))):
+        value = getattr(state, name)
+        setattr(
+            state,
+            name,
+            move if math.isnan(value) else alpha * move + (1 - alpha) * value,
+        )
+    values["rsi"] = (
+        float(relative_strength(state.rsi_up, state.rsi_down))
+        if state.bars >= RSI_WINDOW
+        else math.nan
+    )
+    return values
+
+
+def trend(short: np.ndarray, medium: np.ndarray, long: np.ndarray) -> np.ndarray:
+    return np.select(
+        [(short >= medium) & (medium >= long), (short <= medium) & (medium <= long)],
+        ["positive", "negative"],
+        "neutral",
+    )
+
+
+def crossover(previous: np.ndarray, latest: np.ndarray) -> np.ndarray:
+    return np.select(
+        [(previous <= 0) & (latest >= 0), (previous >= 0) & (latest <= 0)],
+        ["positive", "negative"],
+        "neutral",
+    )
+
+
+def threshold(values: np.ndarray, low: float = 25, high: float = 75) -> np.ndarray:
+    return np.select(
+        [values <= low, values >= high], ["positive", "negative"], "neutral"
+    )
+
+
+def label(
+    latest: dict[str, np.ndarray], previous_macd_diff: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Labels indicator values as positive, negative or neutral."""
+    return {
+        "sma": trend(*(latest[f"sma_{w}"] for w in SMA_WINDOWS)),
+        "ema": trend(*(latest[f"ema_{w}"] for w in SMA_WINDOWS)),
+        "macd": crossover(previous_macd_diff, latest["macd_diff"]),
+        "rsi": threshold(latest["rsi"]),
+    }
+
+
+def save_labels(stock_ids: list[int], labels: dict[str, np.ndarray]) -> int:
+    objs = [
+        models.Indicator(stock_id=stock_id, name=name, value=values[i])
+        for name, values in labels.items()
+        for i, stock_id in enumerate(stock_ids)
+    ]
+    return len(
+        models.Indicator.objects.bulk_upsert(objs, unique_fields=["stock", "name"])
+    )
+
+
+def save_series(
+    stock_ids: list[int], timestamps: list[tuple], series: dict[str, np.ndarray]
+) -> int:
+    """Upserts indicator values per stock and bar into IndicatorValue, storing
+    values still warming up as nulls."""
+    objs = []
+    for i, stock_id in enumerate(stock_ids):
+        n = len(timestamps[i])
+        columns = {name: values[i, -n:].tolist() for name, values in series.items()}
+        for t, timestamp in enumerate(timestamps[i]):
+            objs.append(
+                models.IndicatorValue(
+                    stock_id=stock_id,
+                    timestamp=timestamp,
+                    **{
+                        name: None if math.isnan(values[t]) else values[t]
+                        for name, values in columns.items()
+                    },
+                )
+            )
+    return len(
+        models.IndicatorValue.objects.bulk_upsert(
+            objs, unique_fields=["stock", "timestamp"]
+        )
+    )
+
+
+def update_indicators(stock_ids: Optional[Iterable[int]] = None) -> int:
+    """Recomputes the indicators of the given stocks (or all stocks) from their
+    full price history, upserting their labels, IndicatorState and the whole
+    IndicatorValue series.
+
+    Returns:
+        int: Number of Indicator rows written
+    """
+    ids, timestamps, closes = load_closes(stock_ids)
+    if not ids:
+        return 0
+    series, state = compute(closes)
+    previous = np.full(len(ids), np.nan)
+    if closes.shape[1] > 1:
+        previous = series["macd_diff"][:, -2]
+    labels = label({k: v[:, -1] for k, v in series.items()}, previous)
+
+    states = []
+    for i, stock_id in enumerate(ids):
+        values = {k: v[i] for k, v in state.items()}
+        states.append(
+            models.IndicatorState(
+                stock_id=stock_id,
+                timestamp=timestamps[i][-1],
+                closes=[c for c in values.pop("closes").tolist() if not math.isnan(c)],
+                **{k: v.item() for k, v in values.items()},
+            )
+        )
+    with transaction.atomic():
+        models.IndicatorState.objects.bulk_upsert(states, unique_fields=["stock"])
+        save_series(ids, timestamps, series)
+        return save_labels(ids, labels)
+
+
+def append_bars(stock_id: int, bars: Iterable[tuple]) -> bool:
+    """Advances a stock's indicators by bars newer than its saved state, falling
+    back to a full recompute when there is no state or a bar is not newer.
+
+    Args:
+        stock_id (int): Stock the bars belong to
+        bars (Iterable[tuple]): (timestamp, close) pairs in chronological order
+
+    Returns:
+        bool: Whether the incremental path was taken
+    """
+    bars = list(bars)
+    with transaction.atomic():
+        state = (
+            models.IndicatorState.objects.select_for_update()
+            .filter(stock_id=stock_id)
+            .first()
+        )
+        if state is None or not bars or bars[0][0] <= state.timestamp:
+            update_indicators([stock_id])
+            return False
+
+        timestamps = [timestamp for timestamp, _ in bars]
+        history = []
+        for timestamp, close in bars:
+            previous, values = state.macd_diff, advance(state, float(close))
+            state.timestamp = timestamp
+            history.append(values)
+        state.save()
+        save_series(
+            [stock_id],
+            [timestamps],
+            {k: np.array([[v[k] for v in history]]) for k in values},
+        )
+        labels = label(
+            {k: np.array([v]) for k, v in values.items()}, np.array([previous])
+        )
+        save_labels([stock_id], labels)
+    return True
@@ -0,0 +1,119 @@
+import logging
+import time
+import traceback
+from typing import Callable, Optional
+
+from django.db import transaction
+from django.utils.timezone import now, timedelta
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+registry: dict[str, Callable] = {}
+
+
+def task(func: Callable) -> Callable:
+    """Registers a function so that it can be enqueued by name.
+
+    Args:
+        func (Callable): Task function. Its keyword arguments must be JSON serialisable.
+
+    Returns:
+        Callable: The same function, unchanged.
+    """
+    registry[func.__name__] = func
+    return func
+
+
+def enqueue(
+    name: str, stock: Optional[models.Stock] = None, max_attempts: int = 3, **kwargs
+) -> models.Job:
+    """Adds a job to the queue. The job becomes visible to workers once the
+    surrounding transaction commits.
+
+    Args:
+        name (str): Name of a registered task.
+        stock (models.Stock, optional): Stock the job relates to, used for status lookups.
+        max_attempts (int, optional): Number of runs before the job is marked failed. Defaults to 3.
+
+    Returns:
+        models.Job: The queued job.
+    """
+    if name not in registry:
+        raise KeyError(f"Unknown task {name!r}")
+    return models.Job.objects.create(
+        name=name, stock=stock, max_attempts=max_attempts, kwargs=kwargs
+    )
+
+
+def claim() -> Optional[models.Job]:
+    """Locks the next due job and marks it as running. Rows locked by other
+    workers are skipped, so several workers can poll the same table."""
+    with transaction.atomic():
+        job = (
+            models.Job.objects.select_for_update(skip_locked=True)
+            .filter(status=models.Job.StatusChoices.QUEUED, run_after__lte=now())
+            .order_by("run_after", "pk")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = models.Job.StatusChoices.RUNNING
+        job.attempts += 1
+        job.save(update_fields=["status", "attempts", "updated_at"])
+    return job
+
+
+def backoff(attempts: int, base: float = 30) -> timedelta:
+    return timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+def run(job: models.Job) -> models.Job:
+    """Runs a claimed job, requeueing it with exponential backoff on failure
+    until `max_attempts` is reached."""
+    try:
+        job.result = registry[job.name](**job.kwargs)
+    except Exception:
+        logger.exception("Job %s failed on attempt %s", job, job.attempts)
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = models.Job.StatusChoices.QUEUED
+            job.run_after = now() + backoff(job.attempts)
+        else:
+            job.status = models.Job.StatusChoices.FAILED
+    else:
+        job.status = models.Job.StatusChoices.SUCCEEDED
+        job.error = None
+    job.save()
+    return job
+
+
+def requeue_stale(timeout: timedelta = timedelta(minutes=30)) -> int:
+    """Returns jobs left running by a worker that died back to the queue."""
+    return models.Job.objects.filter(
+        status=models.Job.StatusChoices.RUNNING, updated_at__lt=now() - timeout
+    ).update(status=models.Job.StatusChoices.QUEUED, run_after=now())
+
+
+def work(poll_interval: float = 1, burst: bool = False, requeue_interval: float = 60):
+    """Processes jobs until interrupted. Stale jobs are requeued periodically, so
+    jobs of a worker that crashed are picked up while the others keep running.
+
+    Args:
+        poll_interval (float, optional): Seconds to sleep when the queue is empty. Defaults to 1.
+        burst (bool, optional): Return once the queue is empty instead of polling. Defaults to False.
+        requeue_interval (float, optional): Seconds between checks for stale jobs. Defaults to 60.
+    """
+    requeued_at = None
+    while True:
+        if requeued_at is None or time.monotonic() - requeued_at >= requeue_interval:
+            requeue_stale()
+            requeued_at = time.monotonic()
+        job = claim()
+        if job is None:
+            if burst:
+                return
+            time.sleep(poll_interval)
+            continue
+        run(job)
@@ -0,0 +1,41 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import connection
+
+_locks: dict[str, tuple[threading.Lock, int]] = {}
+_locks_lock = threading.Lock()
+
+
+@contextmanager
+def single_flight(key: str):
+    """Runs the enclosed block for one caller per key at a time, across threads
+    and processes. Other callers block until it finishes, so they should check
+    for its result before repeating the work.
+
+    Threads of the same process queue on an in-process lock first, so only one
+    of them holds a database connection waiting on the Postgres advisory lock
+    that serialises processes.
+
+    Args:
+        key (str): Name of the work, such as the ticker being ingested
+    """
+    with _locks_lock:
+        lock, users = _locks.get(key, (threading.Lock(), 0))
+        _locks[key] = (lock, users + 1)
+    try:
+        with lock:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(hashtext(%s))", [key])
+            try:
+                yield
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", [key])
+    finally:
+        with _locks_lock:
+            lock, users = _locks[key]
+            if users == 1:
+                del _locks[key]
+            else:
+                _locks[key] = (lock, users - 1)
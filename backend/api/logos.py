@@ -0,0 +1,64 @@
+import hashlib
+import mimetypes
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from . import http, models, services
+
+LOGO_DIR = "logos"
+
+
+def store_logo(content: bytes, content_type: str) -> str:
+    """Saves an image under MEDIA_ROOT, named by the SHA-256 of its content so
+    identical images share one file and the file never changes.
+
+    Args:
+        content (bytes): Image data
+        content_type (str): Content-Type the image was served with
+
+    Returns:
+        str: URL the image is served from
+    """
+    extension = mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+    name = f"{LOGO_DIR}/{hashlib.sha256(content).hexdigest()}{extension}"
+    path = Path(settings.MEDIA_ROOT) / name
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so the file is never served half written
+        partial = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}")
+        partial.write_bytes(content)
+        os.replace(partial, path)
+    return settings.MEDIA_URL + name
+
+
+def update_logo(stock: models.Stock) -> str:
+    """Finds a stock's logo and stores a local copy of it. Stocks sharing a name
+    reuse the same file without searching again.
+
+    Args:
+        stock (models.Stock): Stock to update
+
+    Returns:
+        str: URL the logo is served from
+    """
+    image_url = (
+        models.Stock.objects.filter(
+            name=stock.name, image_url__startswith=settings.MEDIA_URL
+        )
+        .exclude(pk=stock.pk)
+        .values_list("image_url", flat=True)
+        .first()
+    )
+    if image_url is None:
+        response = http.get("images", services.get_image_url(stock.name))
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        if not content_type.startswith("image/"):
+            raise ValueError(f"Logo of {stock.ticker} is not an image: {content_type}")
+        image_url = store_logo(response.content, content_type)
+    stock.image_url = image_url
+    stock.save(update_fields=["image_url"])
+    return image_url
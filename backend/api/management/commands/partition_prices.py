@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api import models
+
+
+class Command(BaseCommand):
+    help = "Converts the price table into one hash partitioned by stock"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=16,
+            help="Number of hash partitions",
+        )
+
+    def handle(self, *args, **options):
+        partitions = options["partitions"]
+        table = models.Price._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+                [table],
+            )
+            if cursor.fetchone():
+                raise CommandError(f"{table} is already partitioned")
+
+            # Recreate Django's constraints and indexes under their existing
+            # names so later migrations can still find them.
+            constraints = connection.introspection.get_constraints(cursor, table)
+            primary_key = next(n for n, c in constraints.items() if c["primary_key"])
+            foreign_key = next(n for n, c in constraints.items() if c["foreign_key"])
+            unique = next(
+                n
+                for n, c in constraints.items()
+                if c["unique"] and c["columns"] == ["stock_id", "timestamp"]
+            )
+            stock_index = next(
+                n
+                for n, c in constraints.items()
+                if c["index"] and not c["unique"] and c["columns"] == ["stock_id"]
+            )
+
+            new = f"{table}_partitioned"
+            statements = [
+                f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE",
+                # Identity columns are not allowed on partitioned tables before
+                # Postgres 17, so ids come from a plain sequence instead.
+                f"CREATE SEQUENCE {new}_id_seq AS bigint",
+                f"SELECT setval('{new}_id_seq', COALESCE(MAX(id), 0) + 1, false) "
+                f"FROM {table}",
+                f"CREATE TABLE {new} (LIKE {table}) PARTITION BY HASH (stock_id)",
+                f"ALTER TABLE {new} ALTER COLUMN id SET DEFAULT nextval('{new}_id_seq')",
+                *[
+                    f"CREATE TABLE {table}_p{i} PARTITION OF {new} "
+                    f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+                    for i in range(partitions)
+                ],
+                f"INSERT INTO {new} SELECT * FROM {table}",
+                f"DROP TABLE {table}",
+                f"ALTER TABLE {new} RENAME TO {table}",
+                f"ALTER SEQUENCE {new}_id_seq RENAME TO {table}_id_seq",
+                f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id",
+                # Unique constraints on a partitioned table must include the
+                # partition key, hence the (id, stock_id) primary key.
+                f"ALTER TABLE {table} ADD CONSTRAINT {primary_key} "
+                f"PRIMARY KEY (id, stock_id)",
+                f"ALTER TABLE {table} ADD CONSTRAINT {unique} "
+                f'UNIQUE (stock_id, "timestamp")',
+                f"ALTER TABLE {table} ADD CONSTRAINT {foreign_key} "
+                f"FOREIGN KEY (stock_id) REFERENCES {models.Stock._meta.db_table} (id) "
+                f"DEFERRABLE INITIALLY DEFERRED",
+                f"CREATE INDEX {stock_index} ON {table} (stock_id)",
+                f"ANALYZE {table}",
+            ]
+            for statement in statements:
+                cursor.execute(statement)
+        self.stdout.write(f"{table}: split into {partitions} partitions")
@@ -0,0 +1,107 @@
+import csv
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api import models, services
+
+logger = logging.getLogger(__name__)
+
+# First cells that mark a header row rather than a ticker
+HEADERS = {"TICKER", "SYMBOL"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Ingests the tickers listed in a file, one per line, skipping stocks that "
+        "are already stored so an interrupted preload can be run again"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "file",
+            help="File with one ticker per line, or a CSV with tickers in the first column",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of stocks ingested at once",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["file"], newline="") as f:
+                rows = list(csv.reader(f))
+        except OSError as e:
+            raise CommandError(e)
+        tickers = [row[0].strip().upper() for row in rows if row]
+        if tickers and tickers[0] in HEADERS:
+            tickers = tickers[1:]
+        tickers = list(dict.fromkeys(t for t in tickers if t and not t.startswith("#")))
+
+        max_length = models.Stock._meta.get_field("ticker").max_length
+        too_long = [ticker for ticker in tickers if len(ticker) > max_length]
+        if too_long:
+            self.stderr.write(
+                f"Skipping {len(too_long)} tickers longer than {max_length} characters"
+            )
+        # Yahoo may store a ticker under another spelling, eg. BRK.B as BRK-B,
+        # which earlier runs recorded as a ticker lookup
+        lookups = services.get_ticker_lookups()
+        canonical = dict(
+            models.TickerLookup.objects.filter(
+                query__in=[services.normalize_query(t) for t in tickers]
+            ).values_list("query", "ticker")
+        )
+        stored = set(
+            models.Stock.objects.filter(
+                ticker__in=tickers + [t for t in canonical.values() if t]
+            ).values_list("ticker", flat=True)
+        )
+        done = {
+            t
+            for t in tickers
+            if t in stored or canonical.get(services.normalize_query(t)) in stored
+        }
+        pending = [t for t in tickers if t not in done and len(t) <= max_length]
+        self.stdout.write(
+            f"{len(done)} of {len(tickers)} stocks already stored, "
+            f"ingesting {len(pending)}"
+        )
+
+        def ingest(ticker: str):
+            # Yahoo calls share the "yahoo" rate limit, whatever the pool size
+            try:
+                stock = services.get_or_ingest_stock(ticker).get()
+                if stock.ticker != ticker:
+                    lookups.remember(ticker, stock.ticker)
+            finally:
+                # Each worker thread opens its own connection
+                connection.close()
+
+        failed = []
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = {pool.submit(ingest, ticker): ticker for ticker in pending}
+            for completed, future in enumerate(as_completed(futures), 1):
+                ticker = futures[future]
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception("Ingesting %s failed", ticker)
+                    failed.append(ticker)
+                elapsed = time.monotonic() - start
+                remaining = elapsed / completed * (len(pending) - completed)
+                self.stdout.write(
+                    f"[{completed}/{len(pending)}] {ticker}: "
+                    f"{'failed' if ticker in failed else 'ingested'}, "
+                    f"{remaining:.0f}s remaining"
+                )
+        if failed:
+            self.stderr.write(
+                f"{len(failed)} of {len(pending)} stocks failed: {' '.join(failed)}"
+            )
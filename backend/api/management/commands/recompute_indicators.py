@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from api import indicators, models
+
+
+class Command(BaseCommand):
+    help = "Recomputes the indicators of every stock from its full price history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tickers",
+            nargs="*",
+            help="Tickers to recompute, defaults to every stock",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Stocks computed at once, which bounds the memory used",
+        )
+
+    def handle(self, *args, **options):
+        stocks = models.Stock.objects.order_by("pk")
+        if options["tickers"]:
+            stocks = stocks.filter(ticker__in=options["tickers"])
+        stock_ids = list(stocks.values_list("pk", flat=True))
+        chunk_size = options["chunk_size"]
+        written = 0
+        for start in range(0, len(stock_ids), chunk_size):
+            chunk = stock_ids[start : start + chunk_size]
+            written += indicators.update_indicators(chunk)
+            self.stdout.write(
+                f"[{start + len(chunk)}/{len(stock_ids)}] {written} indicators written"
+            )
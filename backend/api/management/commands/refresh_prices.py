@@ -0,0 +1,52 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api import models, services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Fetches the price bars since each stock's latest price and updates its indicators"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tickers",
+            nargs="*",
+            help="Tickers to refresh, defaults to every stock",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of stocks fetched at once",
+        )
+
+    def handle(self, *args, **options):
+        stocks = models.Stock.objects.order_by("ticker")
+        if options["tickers"]:
+            stocks = stocks.filter(ticker__in=options["tickers"])
+
+        def refresh(stock: models.Stock) -> int:
+            # Yahoo calls share the "yahoo" rate limit, whatever the pool size
+            try:
+                return services.refresh_prices(stock)
+            finally:
+                # Each worker thread opens its own connection
+                connection.close()
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = {pool.submit(refresh, stock): stock for stock in stocks}
+            for future in as_completed(futures):
+                stock = futures[future]
+                try:
+                    self.stdout.write(f"{stock.ticker}: {future.result()} new bars")
+                except Exception:
+                    logger.exception("Refreshing prices of %s failed", stock.ticker)
+                    failed += 1
+        if failed:
+            self.stderr.write(f"{failed} of {len(futures)} stocks failed")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api import cache, services
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-stock daily and all-time sentiment counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sources",
+            nargs="*",
+            choices=list(services.SENTIMENT_SOURCES),
+            help="Sources to refresh, defaults to all of them",
+        )
+
+    def handle(self, *args, **options):
+        for source in options["sources"] or services.SENTIMENT_SOURCES:
+            services.refresh_sentiment_counts(source)
+            self.stdout.write(f"{source}: refreshed")
+        cache.invalidate()
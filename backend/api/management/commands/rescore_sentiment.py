@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import django
+from django.core.management.base import BaseCommand
+
+from api import cache, models, services
+
+SOURCES = {
+    "tweet": (models.Tweet, "content"),
+    "reddit": (models.Reddit, "content"),
+    "news": (models.News, "headline"),
+}
+
+
+def score_chunk(chunk: list[tuple]) -> list[tuple]:
+    # Runs in a worker process, each of which lazily builds its own analyzer.
+    pks, texts, old = zip(*chunk)
+    sentiments = services.get_sentiments(texts, use_cache=False)
+    return [
+        (pk, sentiment)
+        for pk, sentiment, previous in zip(pks, sentiments, old)
+        if sentiment != previous
+    ]
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Re-scores the sentiment of stored tweets, Reddit posts and news across processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sources",
+            nargs="*",
+            choices=list(SOURCES),
+            help="Sources to re-score, defaults to all of them",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of scoring processes",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Rows read, scored and updated at a time",
+        )
+        parser.add_argument("--ticker", help="Only re-score rows for this stock")
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        chunk_size = options["chunk_size"]
+        ticker = options["ticker"]
+        stock_ids = None
+        if ticker:
+            stock_ids = list(
+                models.Stock.objects.filter(ticker=ticker).values_list("pk", flat=True)
+            )
+        # Re-scoring implies the scoring rules changed, so cached labels are
+        # stale. Only the selected stock's are dropped when one is given.
+        sentiment_cache = services.get_sentiment_cache()
+        if not ticker:
+            sentiment_cache.clear()
+        # Spawned workers need Django configured before unpickling score_chunk,
+        # since its module imports the models.
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            for source in options["sources"] or SOURCES:
+                model, field = SOURCES[source]
+                qs = model.objects.all()
+                if ticker:
+                    qs = qs.filter(stock_id__in=stock_ids)
+                rows = qs.values_list("pk", field, "sentiment").iterator(
+                    chunk_size=chunk_size
+                )
+
+                scored = updated = 0
+                pending = set()
+                for chunk in chunked(rows, chunk_size):
+                    # Bound the number of chunks in flight so memory stays flat
+                    # regardless of table size.
+                    if len(pending) >= 2 * workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        updated += self.save(model, done, chunk_size)
+                    if ticker:
+                        sentiment_cache.forget(
+                            [services.sentiment_digest(text) for _, text, _ in chunk]
+                        )
+                    pending.add(pool.submit(score_chunk, chunk))
+                    scored += len(chunk)
+                updated += self.save(model, pending, chunk_size)
+
+                services.refresh_sentiment_counts(source, stock_ids)
+                self.stdout.write(f"{source}: scored {scored}, updated {updated}")
+        # bulk_update bypasses signals, so drop the cached responses at once
+        cache.invalidate(ticker)
+
+    def save(self, model, futures, batch_size: int) -> int:
+        objs = [
+            model(pk=pk, sentiment=sentiment)
+            for future in futures
+            for pk, sentiment in future.result()
+        ]
+        model.objects.bulk_update(objs, ["sentiment"], batch_size=batch_size)
+        return len(objs)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import jobs
+from dataprod.config import Config, config
+
+config: Config
+
+
+class Command(BaseCommand):
+    help = "Runs a worker that processes queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        if config.cache_backend == "locmem":
+            # Invalidations made by jobs would never reach the web process
+            raise CommandError(
+                "CACHE_BACKEND=locmem is private to each process, use file or redis"
+            )
+        jobs.work(poll_interval=options["poll_interval"], burst=options["burst"])
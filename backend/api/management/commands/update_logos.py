@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import jobs, models
+
+
+class Command(BaseCommand):
+    help = "Queues a logo lookup for every stock whose logo is not stored locally"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tickers",
+            nargs="*",
+            help="Tickers to update, defaults to every stock",
+        )
+
+    def handle(self, *args, **options):
+        # Also matches stocks without a logo, as exclude() keeps NULLs
+        stocks = models.Stock.objects.exclude(image_url__startswith=settings.MEDIA_URL)
+        if options["tickers"]:
+            stocks = stocks.filter(ticker__in=options["tickers"])
+        queued = 0
+        for stock in stocks.order_by("ticker"):
+            jobs.enqueue("update_logo", stock=stock, stock_id=stock.pk)
+            queued += 1
+        self.stdout.write(f"Queued {queued} logo lookups, run a worker to process them")
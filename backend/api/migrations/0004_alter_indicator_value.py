@@ -1,16 +1,54 @@
 # Generated by Django 4.1.3 on 2022-11-22 01:20
 
+import pandas as pd
 from django.db import migrations, models
+from ta.momentum import RSIIndicator
+from ta.trend import MACD, EMAIndicator, SMAIndicator
 
-from api import services
+
+def trend(fast: float, medium: float, slow: float) -> str:
+    if fast >= medium >= slow:
+        return "positive"
+    if fast <= medium <= slow:
+        return "negative"
+    return "neutral"
 
 
 def forward(apps, schema_editor):
+    # The indicator logic of this point in history, frozen here because
+    # services.calculate_indices now relies on tables added by later migrations
     Indicator = apps.get_model("api", "Indicator")
     Stock = apps.get_model("api", "Stock")
     Indicator.objects.all().delete()
     for stock in Stock.objects.all():
-        services.calculate_indices(stock)
+        prices = stock.price_set.order_by("timestamp").values_list("close", flat=True)
+        close = pd.Series(list(prices), dtype=float)
+        if len(close) < 2:
+            continue
+        sma = [
+            SMAIndicator(close=close, window=w).sma_indicator().iloc[-1]
+            for w in (50, 100, 200)
+        ]
+        ema = [
+            EMAIndicator(close=close, window=w).ema_indicator().iloc[-1]
+            for w in (50, 100, 200)
+        ]
+        macd = MACD(close=close).macd_diff()
+        rsi = RSIIndicator(close=close).rsi().iloc[-1]
+        values = dict(
+            sma=trend(*sma),
+            ema=trend(*ema),
+            macd="positive"
+            if macd.iloc[-2] <= 0 and macd.iloc[-1] >= 0
+            else "negative"
+            if macd.iloc[-2] >= 0 and macd.iloc[-1] <= 0
+            else "neutral",
+            rsi="positive" if rsi <= 25 else "negative" if rsi >= 75 else "neutral",
+        )
+        for name, value in values.items():
+            Indicator.objects.update_or_create(
+                stock=stock, name=name, defaults=dict(value=value)
+            )
 
 
 def backward(apps, schema_editor):
@@ -0,0 +1,34 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+def forward(apps, schema_editor):
+    # Keep only the most recently inserted row for each duplicated bar
+    schema_editor.execute(
+        """
+        DELETE FROM api_price a USING api_price b
+        WHERE a.stock_id = b.stock_id AND a.timestamp = b.timestamp AND a.id < b.id
+        """
+    )
+
+
+def backward(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_job"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+        migrations.AddConstraint(
+            model_name="price",
+            constraint=models.UniqueConstraint(
+                fields=("stock", "timestamp"), name="price_stock_timestamp_unique"
+            ),
+        ),
+    ]
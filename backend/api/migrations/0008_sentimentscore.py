@@ -0,0 +1,32 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_price_stock_timestamp_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SentimentScore",
+            fields=[
+                (
+                    "digest",
+                    models.CharField(max_length=40, primary_key=True, serialize=False),
+                ),
+                (
+                    "sentiment",
+                    models.TextField(
+                        choices=[
+                            ("positive", "Positive"),
+                            ("negative", "Negative"),
+                            ("neutral", "Neutral"),
+                        ]
+                    ),
+                ),
+            ],
+        ),
+    ]
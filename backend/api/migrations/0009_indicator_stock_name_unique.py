@@ -0,0 +1,34 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:27
+
+from django.db import migrations, models
+
+
+def forward(apps, schema_editor):
+    # Keep only the most recently written value of each indicator
+    schema_editor.execute(
+        """
+        DELETE FROM api_indicator a USING api_indicator b
+        WHERE a.stock_id = b.stock_id AND a.name = b.name AND a.id < b.id
+        """
+    )
+
+
+def backward(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_sentimentscore"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+        migrations.AddConstraint(
+            model_name="indicator",
+            constraint=models.UniqueConstraint(
+                fields=("stock", "name"), name="indicator_stock_name_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:29
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_indicator_stock_name_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndicatorState",
+            fields=[
+                (
+                    "stock",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="api.stock",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+                ("bars", models.PositiveIntegerField()),
+                (
+                    "closes",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.FloatField(), size=None
+                    ),
+                ),
+                ("sma_50_sum", models.FloatField()),
+                ("sma_100_sum", models.FloatField()),
+                ("sma_200_sum", models.FloatField()),
+                ("ema_12", models.FloatField()),
+                ("ema_26", models.FloatField()),
+                ("ema_50", models.FloatField()),
+                ("ema_100", models.FloatField()),
+                ("ema_200", models.FloatField()),
+                ("macd_signal", models.FloatField()),
+                ("macd_diff", models.FloatField()),
+                ("rsi_up", models.FloatField()),
+                ("rsi_down", models.FloatField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_indicatorstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndicatorValue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+                ("sma_50", models.FloatField(null=True)),
+                ("sma_100", models.FloatField(null=True)),
+                ("sma_200", models.FloatField(null=True)),
+                ("ema_50", models.FloatField(null=True)),
+                ("ema_100", models.FloatField(null=True)),
+                ("ema_200", models.FloatField(null=True)),
+                ("macd_diff", models.FloatField(null=True)),
+                ("rsi", models.FloatField(null=True)),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.stock"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="indicatorvalue",
+            constraint=models.UniqueConstraint(
+                fields=("stock", "timestamp"),
+                name="indicatorvalue_stock_timestamp_unique",
+            ),
+        ),
+    ]
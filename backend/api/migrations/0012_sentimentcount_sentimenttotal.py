@@ -0,0 +1,131 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def forward(apps, schema_editor):
+    for source, table in [
+        ("tweet", "api_tweet"),
+        ("reddit", "api_reddit"),
+        ("news", "api_news"),
+    ]:
+        schema_editor.execute(
+            f"""
+            INSERT INTO api_sentimentcount
+                (stock_id, source, day, positive, negative, neutral)
+            SELECT
+                stock_id,
+                %s,
+                (timestamp AT TIME ZONE 'UTC')::date,
+                count(*) FILTER (WHERE sentiment = 'positive'),
+                count(*) FILTER (WHERE sentiment = 'negative'),
+                count(*) FILTER (WHERE sentiment = 'neutral')
+            FROM {table}
+            GROUP BY 1, 3
+            """,
+            [source],
+        )
+    schema_editor.execute(
+        """
+        INSERT INTO api_sentimenttotal (stock_id, source, positive, negative, neutral)
+        SELECT stock_id, source, sum(positive), sum(negative), sum(neutral)
+        FROM api_sentimentcount
+        GROUP BY stock_id, source
+        """
+    )
+
+
+def backward(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_indicatorvalue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SentimentTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.TextField(
+                        choices=[
+                            ("tweet", "Tweet"),
+                            ("reddit", "Reddit"),
+                            ("news", "News"),
+                        ]
+                    ),
+                ),
+                ("positive", models.PositiveIntegerField(default=0)),
+                ("negative", models.PositiveIntegerField(default=0)),
+                ("neutral", models.PositiveIntegerField(default=0)),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.stock"
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SentimentCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.TextField(
+                        choices=[
+                            ("tweet", "Tweet"),
+                            ("reddit", "Reddit"),
+                            ("news", "News"),
+                        ]
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("positive", models.PositiveIntegerField(default=0)),
+                ("negative", models.PositiveIntegerField(default=0)),
+                ("neutral", models.PositiveIntegerField(default=0)),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.stock"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="sentimenttotal",
+            constraint=models.UniqueConstraint(
+                fields=("stock", "source"), name="sentimenttotal_stock_source_unique"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sentimentcount",
+            constraint=models.UniqueConstraint(
+                fields=("stock", "source", "day"),
+                name="sentimentcount_stock_source_day_unique",
+            ),
+        ),
+        migrations.RunPython(forward, backward),
+    ]
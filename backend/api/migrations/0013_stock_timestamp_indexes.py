@@ -0,0 +1,31 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_sentimentcount_sentimenttotal"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="news",
+            index=models.Index(
+                fields=["stock", "timestamp"], name="news_stock_timestamp_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reddit",
+            index=models.Index(
+                fields=["stock", "timestamp"], name="reddit_stock_timestamp_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tweet",
+            index=models.Index(
+                fields=["stock", "timestamp"], name="tweet_stock_timestamp_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_stock_timestamp_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="news",
+            name="news_stock_timestamp_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="reddit",
+            name="reddit_stock_timestamp_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="tweet",
+            name="tweet_stock_timestamp_idx",
+        ),
+        migrations.AddIndex(
+            model_name="news",
+            index=models.Index(
+                fields=["stock", "timestamp", "id"], name="news_stock_timestamp_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reddit",
+            index=models.Index(
+                fields=["stock", "timestamp", "id"],
+                name="reddit_stock_timestamp_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tweet",
+            index=models.Index(
+                fields=["stock", "timestamp", "id"], name="tweet_stock_timestamp_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+FIELDS = ["open", "high", "low", "close"]
+
+
+def alter_columns(type_: str) -> str:
+    # One ALTER TABLE rewrites the table once rather than once per column
+    return "ALTER TABLE api_price " + ", ".join(
+        f'ALTER COLUMN "{field}" TYPE {type_}' for field in FIELDS
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    alter_columns("double precision"),
+                    alter_columns("numeric(20, 5)"),
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="price",
+                    name=field,
+                    field=models.FloatField(),
+                )
+                for field in FIELDS
+            ],
+        ),
+    ]
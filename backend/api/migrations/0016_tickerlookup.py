@@ -0,0 +1,24 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_price_float"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TickerLookup",
+            fields=[
+                (
+                    "query",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("ticker", models.CharField(max_length=20, null=True)),
+                ("resolved_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,7 +1,9 @@
+from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.utils import timezone
 
-from models import FuzzySearchable
+from models import BulkUpsertable, FuzzySearchable
 
 
 class Stock(models.Model):
@@ -26,10 +28,19 @@ class Stock(models.Model):
 
 
 class Price(models.Model):
-    open = models.DecimalField(max_digits=20, decimal_places=5)
-    high = models.DecimalField(max_digits=20, decimal_places=5)
-    low = models.DecimalField(max_digits=20, decimal_places=5)
-    close = models.DecimalField(max_digits=20, decimal_places=5)
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="price_stock_timestamp_unique", fields=["stock", "timestamp"]
+            )
+        ]
+
+    objects = BulkUpsertable.as_manager()
+
+    open = models.FloatField()
+    high = models.FloatField()
+    low = models.FloatField()
+    close = models.FloatField()
     timestamp = models.DateTimeField()
     stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
 
@@ -44,6 +55,16 @@ class SentimentChoices(models.TextChoices):
 
 
 class News(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(
+                name="news_stock_timestamp_id_idx",
+                fields=["stock", "timestamp", "id"],
+            )
+        ]
+
+    objects = BulkUpsertable.as_manager()
+
     headline = models.TextField()
     url = models.TextField(unique=True)
     timestamp = models.DateTimeField()
@@ -53,6 +74,16 @@ class News(models.Model):
 
 
 class Tweet(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(
+                name="tweet_stock_timestamp_id_idx",
+                fields=["stock", "timestamp", "id"],
+            )
+        ]
+
+    objects = BulkUpsertable.as_manager()
+
     api_id = models.PositiveBigIntegerField(unique=True)
     content = models.TextField()
     timestamp = models.DateTimeField()
@@ -68,7 +99,28 @@ class Tweet(models.Model):
     stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
 
 
+class SentimentScore(models.Model):
+    digest = models.CharField(max_length=40, primary_key=True)
+    sentiment = models.TextField(choices=SentimentChoices.choices)
+
+
+class TickerLookup(models.Model):
+    query = models.CharField(max_length=255, primary_key=True)
+    ticker = models.CharField(max_length=20, null=True)
+    resolved_at = models.DateTimeField()
+
+
 class Reddit(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(
+                name="reddit_stock_timestamp_id_idx",
+                fields=["stock", "timestamp", "id"],
+            )
+        ]
+
+    objects = BulkUpsertable.as_manager()
+
     api_id = models.TextField(unique=True)
     title = models.TextField()
     content = models.TextField()
@@ -84,6 +136,52 @@ class Reddit(models.Model):
         return f"{self.title}"
 
 
+class SentimentSourceChoices(models.TextChoices):
+    TWEET = "tweet"
+    REDDIT = "reddit"
+    NEWS = "news"
+
+
+class SentimentCount(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="sentimentcount_stock_source_day_unique",
+                fields=["stock", "source", "day"],
+            )
+        ]
+
+    objects = BulkUpsertable.as_manager()
+
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
+    source = models.TextField(choices=SentimentSourceChoices.choices)
+    day = models.DateField()
+    positive = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+
+
+class SentimentTotal(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="sentimenttotal_stock_source_unique", fields=["stock", "source"]
+            )
+        ]
+
+    objects = BulkUpsertable.as_manager()
+
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
+    source = models.TextField(choices=SentimentSourceChoices.choices)
+    positive = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+
+
+class IndicatorQuerySet(FuzzySearchable, BulkUpsertable):
+    pass
+
+
 class Indicator(models.Model):
     class IndicatorValueChoices(models.TextChoices):
         POSITIVE = "positive"
@@ -98,8 +196,13 @@ class Indicator(models.Model):
                 opclasses=["gin_trgm_ops"],
             )
         ]
+        constraints = [
+            models.UniqueConstraint(
+                name="indicator_stock_name_unique", fields=["stock", "name"]
+            )
+        ]
 
-    objects = FuzzySearchable.as_manager()
+    objects = IndicatorQuerySet.as_manager()
 
     name = models.TextField()
     value = models.TextField(choices=IndicatorValueChoices.choices)
@@ -107,3 +210,82 @@ class Indicator(models.Model):
 
     def __str__(self) -> str:
         return f"{self.stock.name} @ {self.name}: {self.value}"
+
+
+# Running indicator state as of a stock's latest price, so that a new bar can be
+# folded in without reading the price history.
+class IndicatorState(models.Model):
+    objects = BulkUpsertable.as_manager()
+
+    stock = models.OneToOneField(Stock, primary_key=True, on_delete=models.CASCADE)
+    timestamp = models.DateTimeField()
+    bars = models.PositiveIntegerField()
+    # The last 200 closes, enough to drop the oldest close from every SMA window
+    closes = ArrayField(models.FloatField())
+    sma_50_sum = models.FloatField()
+    sma_100_sum = models.FloatField()
+    sma_200_sum = models.FloatField()
+    ema_12 = models.FloatField()
+    ema_26 = models.FloatField()
+    ema_50 = models.FloatField()
+    ema_100 = models.FloatField()
+    ema_200 = models.FloatField()
+    macd_signal = models.FloatField()
+    macd_diff = models.FloatField()
+    rsi_up = models.FloatField()
+    rsi_down = models.FloatField()
+
+
+class IndicatorValue(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="indicatorvalue_stock_timestamp_unique",
+                fields=["stock", "timestamp"],
+            )
+        ]
+
+    objects = BulkUpsertable.as_manager()
+
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
+    timestamp = models.DateTimeField()
+    sma_50 = models.FloatField(null=True)
+    sma_100 = models.FloatField(null=True)
+    sma_200 = models.FloatField(null=True)
+    ema_50 = models.FloatField(null=True)
+    ema_100 = models.FloatField(null=True)
+    ema_200 = models.FloatField(null=True)
+    macd_diff = models.FloatField(null=True)
+    rsi = models.FloatField(null=True)
+
+
+class Job(models.Model):
+    class StatusChoices(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                name="job_status_run_after_idx", fields=["status", "run_after"]
+            )
+        ]
+
+    name = models.TextField()
+    kwargs = models.JSONField(default=dict)
+    status = models.TextField(
+        choices=StatusChoices.choices, default=StatusChoices.QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True)
+    error = models.TextField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    stock = models.ForeignKey(Stock, null=True, on_delete=models.CASCADE)
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk}: {self.status}"
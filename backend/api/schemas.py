@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Any, Literal, Optional
 
+import numpy as np
 from pydantic import BaseModel
 
 from api import models
@@ -52,6 +53,44 @@ class Price(BaseModel):
         )
 
 
+class PriceSeries(BaseModel):
+    timestamp: list[datetime]
+    open: list[float]
+    high: list[float]
+    low: list[float]
+    close: list[float]
+
+    @classmethod
+    def from_values(cls, rows: list[tuple]):
+        columns = list(zip(*rows)) or [[] for _ in cls.__fields__]
+        return cls(**dict(zip(cls.__fields__, columns)))
+
+    def to_float64(self) -> bytes:
+        """Packs the columns as little-endian float64 arrays one after another,
+        with timestamps as seconds since the epoch, ie. 5 * n doubles."""
+        timestamps = [timestamp.timestamp() for timestamp in self.timestamp]
+        columns = [timestamps, self.open, self.high, self.low, self.close]
+        return np.array(columns, dtype="<f8").tobytes()
+
+    def to_arrow(self) -> bytes:
+        """Serialises the columns as an Arrow IPC stream. Requires pyarrow."""
+        import pyarrow as pa
+
+        table = pa.table(
+            {
+                "timestamp": pa.array(self.timestamp, pa.timestamp("us", tz="UTC")),
+                **{
+                    field: self.__dict__[field]
+                    for field in ["open", "high", "low", "close"]
+                },
+            }
+        )
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
 class Reddit(BaseModel):
     title: str
     content: str
@@ -136,6 +175,87 @@ class Indicator(BaseModel):
         )
 
 
+class IndicatorSeries(BaseModel):
+    timestamp: list[datetime]
+    sma_50: list[Optional[float]]
+    sma_100: list[Optional[float]]
+    sma_200: list[Optional[float]]
+    ema_50: list[Optional[float]]
+    ema_100: list[Optional[float]]
+    ema_200: list[Optional[float]]
+    macd_diff: list[Optional[float]]
+    rsi: list[Optional[float]]
+
+    @classmethod
+    def from_values(cls, rows: list[tuple]):
+        columns = list(zip(*rows)) or [[] for _ in cls.__fields__]
+        return cls(**dict(zip(cls.__fields__, columns)))
+
+
+class SentimentSeries(BaseModel):
+    timestamp: list[datetime]
+    positive: list[int]
+    negative: list[int]
+    neutral: list[int]
+
+    @classmethod
+    def from_values(cls, rows: list[tuple]):
+        columns = list(zip(*rows)) or [[] for _ in cls.__fields__]
+        return cls(**dict(zip(cls.__fields__, columns)))
+
+
 class PieValue(BaseModel):
     key: str
     value: float
+
+
+class Job(BaseModel):
+    id: int
+    name: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    result: Any
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_orm(cls, job: models.Job):
+        return cls(
+            id=job.pk,
+            name=job.name,
+            status=job.status,
+            attempts=job.attempts,
+            max_attempts=job.max_attempts,
+            run_after=job.run_after,
+            result=job.result,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+        )
+
+
+class CacheStats(BaseModel):
+    hits: int
+    persistent_hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class TickerLookupStats(BaseModel):
+    hits: int
+    negative_hits: int
+    misses: int
+    hit_rate: float
+
+
+class RateLimitStats(BaseModel):
+    provider: str
+    rate: float
+    calls: int
+    waiting: int
+    waited: float
+    max_waited: float
+    retries: int
+    rejected: int
@@ -0,0 +1,239 @@
+import bisect
+import math
+import re
+import threading
+import time
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+from typing import Optional
+
+from django.db import connection
+
+from dataprod.config import Config, config
+
+from . import models
+
+config: Config
+
+Match = namedtuple("Match", ["ticker", "name"])
+
+
+def words(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+@lru_cache(maxsize=100_000)
+def trigrams(word: str) -> frozenset[str]:
+    # Padded like pg_trgm, so prefixes and short words still produce trigrams
+    padded = f"  {word} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+class TypeaheadIndex:
+    """In-memory index of stock tickers and names answering ranked typeahead
+    queries without a database round trip.
+
+    Exact tickers rank first, then ticker prefixes, shortest first, then names
+    with a word starting with each word of the query. Only when nothing matches
+    are stocks returned whose words are each similar to a word of the query,
+    which tolerates typos. Tickers are bucketed by length so the best `limit`
+    prefix matches are found without ranking every match, and trigrams are
+    indexed per distinct word rather than per stock, since names share most of
+    their words.
+    """
+
+    def __init__(self, min_similarity: float = 0.6):
+        self.min_similarity = min_similarity
+        self.stocks: dict[int, tuple[str, str]] = {}
+        self.tickers: dict[int, list[tuple[str, int]]] = defaultdict(list)
+        self.name_words: list[tuple[str, int]] = []
+        self.words: dict[str, set[int]] = defaultdict(set)
+        self.trigrams: dict[str, set[str]] = defaultdict(set)
+        self.built_at = 0.0
+        self.lock = threading.Lock()
+
+    def build(self, stocks: list[tuple[int, str, str]]):
+        """Replaces the contents of the index with (pk, ticker, name) rows."""
+        index = TypeaheadIndex(self.min_similarity)
+        for pk, ticker, name in stocks:
+            index._add(pk, ticker, name)
+        for tickers in index.tickers.values():
+            tickers.sort()
+        index.name_words.sort()
+        with self.lock:
+            self.stocks = index.stocks
+            self.tickers = index.tickers
+            self.name_words = index.name_words
+            self.words = index.words
+            self.trigrams = index.trigrams
+            self.built_at = time.monotonic()
+
+    def _keys(self, pk: int, ticker: str, name: str):
+        return (ticker.lower(), pk), [(word, pk) for word in set(words(name))]
+
+    def _add(self, pk: int, ticker: str, name: str, sort: bool = False):
+        ticker_key, word_keys = self._keys(pk, ticker, name)
+        self.stocks[pk] = (ticker, name)
+        tickers = self.tickers[len(ticker)]
+        if sort:
+            bisect.insort(tickers, ticker_key)
+            for key in word_keys:
+                bisect.insort(self.name_words, key)
+        else:
+            tickers.append(ticker_key)
+            self.name_words.extend(word_keys)
+        for word in words(f"{ticker} {name}"):
+            if word not in self.words:
+                for trigram in trigrams(word):
+                    self.trigrams[trigram].add(word)
+            self.words[word].add(pk)
+
+    def _remove(self, pk: int):
+        ticker, name = self.stocks.pop(pk)
+        ticker_key, word_keys = self._keys(pk, ticker, name)
+        for keys, key in [(self.tickers[len(ticker)], ticker_key)] + [
+            (self.name_words, key) for key in word_keys
+        ]:
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+        for word in words(f"{ticker} {name}"):
+            self.words[word].discard(pk)
+            if not self.words[word]:
+                del self.words[word]
+                for trigram in trigrams(word):
+                    self.trigrams[trigram].discard(word)
+
+    def add(self, pk: int, ticker: str, name: str):
+        """Adds or updates a stock."""
+        with self.lock:
+            if pk in self.stocks:
+                self._remove(pk)
+            self._add(pk, ticker, name, sort=True)
+
+    def remove(self, pk: int):
+        with self.lock:
+            if pk in self.stocks:
+                self._remove(pk)
+
+    @staticmethod
+    def _prefixed(keys: list[tuple[str, int]], prefix: str) -> list[int]:
+        start = bisect.bisect_left(keys, (prefix,))
+        end = bisect.bisect_left(keys, (prefix + "￿",))
+        return [pk for _, pk in keys[start:end]]
+
+    def _order(self, pk: int) -> tuple[int, str]:
+        ticker = self.stocks[pk][0]
+        return len(ticker), ticker
+
+    def search(self, query: str, limit: Optional[int] = None) -> list[Match]:
+        """Ranks the stocks matching `query`.
+
+        Args:
+            query (str): Ticker or company name, or the start of either
+            limit (int, optional): Maximum number of results. Defaults to all of them.
+
+        Returns:
+            list[Match]: Ticker and name of the best matches first
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        with self.lock:
+            found = dict.fromkeys(self._prefixed_tickers(query, limit))
+            if limit is None or len(found) < limit:
+                found.update(dict.fromkeys(self._prefixed_names(query)))
+            if not found:
+                found = dict.fromkeys(self._similar(query))
+            return [Match(*self.stocks[pk]) for pk in list(found)[:limit]]
+
+    def _prefixed_tickers(self, query: str, limit: Optional[int]) -> list[int]:
+        found = []
+        for length in sorted(n for n in self.tickers if n >= len(query)):
+            found.extend(self._prefixed(self.tickers[length], query))
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    def _prefixed_names(self, query: str) -> list[int]:
+        query_words = words(query)
+        if not query_words:
+            return []
+        found = set(self._prefixed(self.name_words, query_words[0]))
+        for word in query_words[1:]:
+            found &= set(self._prefixed(self.name_words, word))
+        return sorted(found, key=self._order)
+
+    def _similar_words(self, query_word: str) -> dict[str, float]:
+        query_trigrams = trigrams(query_word)
+        needed = math.ceil(self.min_similarity * len(query_trigrams))
+        postings = sorted(
+            (self.trigrams.get(trigram, set()) for trigram in query_trigrams), key=len
+        )
+        # A word sharing `needed` trigrams must appear in at least one of the
+        # rarest len - needed + 1 posting lists, so only those are scanned.
+        candidates = set().union(*postings[: len(postings) - needed + 1])
+        shared = {word: sum(word in p for p in postings) for word in candidates}
+        return {
+            word: count / len(query_trigrams)
+            for word, count in shared.items()
+            if count >= needed
+        }
+
+    def _similar(self, query: str) -> list[int]:
+        scores = None
+        for query_word in words(query):
+            best = defaultdict(float)
+            for word, similarity in self._similar_words(query_word).items():
+                for pk in self.words[word]:
+                    best[pk] = max(best[pk], similarity)
+            if scores is None:
+                scores = best
+            else:
+                scores = {pk: scores[pk] + best[pk] for pk in scores.keys() & best}
+        if not scores:
+            return []
+        return sorted(scores, key=lambda pk: (-scores[pk], *self._order(pk)))
+
+
+_index = TypeaheadIndex()
+_building = threading.Lock()
+
+
+def _build():
+    _index.build(models.Stock.objects.values_list("pk", "ticker", "name"))
+
+
+def _refresh():
+    try:
+        if time.monotonic() - _index.built_at > config.search_index_ttl:
+            _build()
+    finally:
+        _building.release()
+        # Runs in its own thread, which opened its own connection
+        connection.close()
+
+
+def get_index() -> TypeaheadIndex:
+    """Returns the process-wide index, built from the database on first use.
+    Once it is older than `search_index_ttl` seconds, which picks up stocks
+    written by other processes, one background thread rebuilds it while
+    requests keep searching the previous contents."""
+    if not _index.built_at:
+        with _building:
+            if not _index.built_at:
+                _build()
+    elif time.monotonic() - _index.built_at > config.search_index_ttl:
+        if _building.acquire(blocking=False):
+            threading.Thread(target=_refresh, daemon=True).start()
+    return _index
+
+
+def index_stock(stock: models.Stock):
+    if _index.built_at:
+        _index.add(stock.pk, stock.ticker, stock.name)
+
+
+def unindex_stock(pk: int):
+    if _index.built_at:
+        _index.remove(pk)
@@ -1,35 +1,46 @@
+import hashlib
+import logging
 import re
+import threading
+import time
 import xml.etree.ElementTree as ET  # built in library
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
 
 import numpy as np
 import pandas as pd
 import praw
-import requests
 import tweepy
-from django.db.models import QuerySet
+from dateutil.parser import parse
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Min, Q, QuerySet
+from django.db.models.functions import Trunc, TruncDate
 from django.utils.timezone import datetime, timedelta, utc
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from serpapi import GoogleSearch
-from ta.momentum import RSIIndicator
-from ta.trend import MACD, EMAIndicator, SMAIndicator
 
 from dataprod.config import Config, config
 
-from . import models
+from . import http, indicators, locks, models, throttle
 
 config: Config
 
+logger = logging.getLogger(__name__)
+
 reddit = praw.Reddit(
     client_id=config.reddit_client_id,
     client_secret=config.reddit_client_secret,
     user_agent=config.reddit_user_agent,
 )
 
-twitter = tweepy.Client(bearer_token=config.twitter_bearer_token)
+# Sleeps until the quota window resets instead of raising on a 429
+twitter = tweepy.Client(
+    bearer_token=config.twitter_bearer_token, wait_on_rate_limit=True
+)
 
 
-base_url = "https://yh-finance.p.rapidapi.com"
+base_url = config.yahoo_finance_url
 headers = {
     "X-RapidAPI-Key": config.yahoo_finance_header_key,
     "X-RapidAPI-Host": "yh-finance.p.rapidapi.com",
@@ -37,78 +48,12 @@ headers = {
 
 
 def calculate_indices(stock: models.Stock):
-    prices = (
-        stock.price_set.all().order_by("timestamp").values_list("high", "low", "close")
-    )
-    prices_df = pd.DataFrame(prices, columns=["high", "low", "close"])
-
-    # Initialise all the indicators
-    sma_50 = SMAIndicator(close=prices_df["close"], window=50).sma_indicator().iloc[-1]
-    sma_100 = (
-        SMAIndicator(close=prices_df["close"], window=100).sma_indicator().iloc[-1]
-    )
-    sma_200 = (
-        SMAIndicator(close=prices_df["close"], window=200).sma_indicator().iloc[-1]
-    )
-    ema_50 = EMAIndicator(close=prices_df["close"], window=50).ema_indicator().iloc[-1]
-    ema_100 = (
-        EMAIndicator(close=prices_df["close"], window=100).ema_indicator().iloc[-1]
-    )
-    ema_200 = (
-        EMAIndicator(close=prices_df["close"], window=200).ema_indicator().iloc[-1]
-    )
-    macd = MACD(close=prices_df["close"]).macd_diff()
-    rsi = RSIIndicator(close=prices_df["close"]).rsi()
-
-    models.Indicator.objects.update_or_create(
-        stock=stock,
-        name="sma",
-        defaults=dict(
-            value="positive"
-            if sma_50 >= sma_100 >= sma_200
-            else "negative"
-            if sma_50 <= sma_100 <= sma_200
-            else "neutral"
-        ),
-    )
-    models.Indicator.objects.update_or_create(
-        stock=stock,
-        name="ema",
-        defaults=dict(
-            value="positive"
-            if ema_50 >= ema_100 >= ema_200
-            else "negative"
-            if ema_50 <= ema_100 <= ema_200
-            else "neutral"
-        ),
-    )
-    models.Indicator.objects.update_or_create(
-        stock=stock,
-        name="macd",
-        defaults=dict(
-            value="positive"
-            if macd.iloc[-2] <= 0 and macd.iloc[-1] >= 0
-            else "negative"
-            if macd.iloc[-2] >= 0 and macd.iloc[-1] <= 0
-            else "neutral"
-        ),
-    )
-    models.Indicator.objects.update_or_create(
-        stock=stock,
-        name="rsi",
-        defaults=dict(
-            value="positive"
-            if rsi.iloc[-1] <= 25
-            else "negative"
-            if rsi.iloc[-1] >= 75
-            else "neutral"
-        ),
-    )
+    indicators.update_indicators([stock.pk])
 
 
 def get_yahoo_autocomplete_stock_ticker(search: str) -> Optional[str]:
-    response = requests.get(
-        f"{base_url}/auto-complete", headers=headers, params={"q": search}
+    response = http.get(
+        "yahoo", f"{base_url}/auto-complete", headers=headers, params={"q": search}
     )
     quotes = response.json()["quotes"]
     if quotes == []:
@@ -116,9 +61,87 @@ def get_yahoo_autocomplete_stock_ticker(search: str) -> Optional[str]:
     return quotes[0]["symbol"]
 
 
+def normalize_query(search: str) -> str:
+    """Folds case and whitespace, so equivalent searches share a lookup."""
+    return " ".join(search.lower().split())[:255]
+
+
+class TickerLookupCache:
+    """Tickers that Yahoo autocomplete resolved searches to, persisted in the
+    TickerLookup table so they are shared between processes and survive
+    restarts. Searches that resolved to no ticker are remembered as well, for
+    `negative_ttl` seconds rather than `ttl`.
+    """
+
+    def __init__(self, ttl: int, negative_ttl: int):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def resolve(self, search: str) -> Optional[str]:
+        """Returns the ticker a search resolves to, calling Yahoo only when no
+        fresh lookup is stored.
+
+        Args:
+            search (str): Ticker or company name
+
+        Returns:
+            Optional[str]: The best matching ticker, or None if there is none
+        """
+        query = normalize_query(search)
+        now = datetime.now(utc)
+        lookup = models.TickerLookup.objects.filter(query=query).first()
+        if lookup:
+            ttl = self.ttl if lookup.ticker else self.negative_ttl
+            if lookup.resolved_at > now - timedelta(seconds=ttl):
+                if lookup.ticker:
+                    self.hits += 1
+                else:
+                    self.negative_hits += 1
+                return lookup.ticker
+        self.misses += 1
+        ticker = get_yahoo_autocomplete_stock_ticker(query)
+        self.remember(query, ticker)
+        return ticker
+
+    def remember(self, search: str, ticker: Optional[str]):
+        """Stores what a search resolves to without asking Yahoo."""
+        models.TickerLookup.objects.update_or_create(
+            query=normalize_query(search),
+            defaults=dict(ticker=ticker, resolved_at=datetime.now(utc)),
+        )
+
+    def info(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return dict(
+            hits=self.hits,
+            negative_hits=self.negative_hits,
+            misses=self.misses,
+            hit_rate=(self.hits + self.negative_hits) / lookups if lookups else 0,
+        )
+
+
+_ticker_lookups = None
+
+
+def get_ticker_lookups() -> TickerLookupCache:
+    global _ticker_lookups
+    if _ticker_lookups is None:
+        _ticker_lookups = TickerLookupCache(
+            ttl=config.ticker_lookup_ttl,
+            negative_ttl=config.ticker_lookup_negative_ttl,
+        )
+    return _ticker_lookups
+
+
 def get_yahoo_stock_data(ticker: str) -> dict:
-    response = requests.get(
-        f"{base_url}/stock/v2/get-summary", headers=headers, params={"symbol": ticker}
+    response = http.get(
+        "yahoo",
+        f"{base_url}/stock/v2/get-summary",
+        headers=headers,
+        params={"symbol": ticker},
     )
     json = response.json()
     data = {
@@ -129,11 +152,14 @@ def get_yahoo_stock_data(ticker: str) -> dict:
     return data
 
 
-def get_yahoo_stock_price(ticker: str) -> pd.DataFrame:
+def get_yahoo_stock_price(
+    ticker: str, since: Optional[datetime] = None
+) -> pd.DataFrame:
     """Gets the stock prices for a given stock
 
     Args:
         ticker (str): The ticker symbol for a stock
+        since (datetime, optional): Only fetch bars from this instant onwards. Defaults to the last two years.
 
     Returns:
         pandas DataFrame
@@ -141,12 +167,19 @@ def get_yahoo_stock_price(ticker: str) -> pd.DataFrame:
     querystring = {
         "interval": "1d",
         "symbol": ticker,
-        "range": "2y",
         "includeAdjustedClose": "true",
     }
-
-    response = requests.get(
-        f"{base_url}/stock/v3/get-chart", headers=headers, params=querystring
+    if since is None:
+        querystring["range"] = "2y"
+    else:
+        querystring["period1"] = int(since.timestamp())
+        querystring["period2"] = int(datetime.now(utc).timestamp())
+
+    response = http.get(
+        "yahoo",
+        f"{base_url}/stock/v3/get-chart",
+        headers=headers,
+        params=querystring,
     ).json()
     if response["chart"]["error"]:
         return
@@ -165,32 +198,330 @@ def get_yahoo_stock_price(ticker: str) -> pd.DataFrame:
     return df
 
 
-def get_stock_from_yahoo(search: str) -> QuerySet:
-    ticker = get_yahoo_autocomplete_stock_ticker(search)
-    stock = models.Stock.objects.none()
-    if ticker:
-        stock = models.Stock.objects.filter(ticker=ticker)
-        if not stock.exists():
-            data = get_yahoo_stock_data(ticker)
-            stock, _ = models.Stock.objects.update_or_create(
-                ticker=data["ticker"],
-                defaults=dict(name=data["name"], summary=data["summary"]),
-                image_url=get_image_url(data["name"]),
+def save_prices(stock: models.Stock, prices: pd.DataFrame) -> int:
+    """Upserts a DataFrame of prices for a stock, as returned by `get_yahoo_stock_price`.
+
+    Args:
+        stock (models.Stock): Stock the prices belong to
+        prices (pd.DataFrame): DataFrame with open, high, low, close and timestamp columns
+
+    Returns:
+        int: Number of rows written
+    """
+    # Yahoo reports missing bars as nulls
+    prices = prices.dropna()
+    objs = models.Price.objects.from_dataframe(
+        prices,
+        dict(open="open", high="high", low="low", close="close", timestamp="timestamp"),
+        stock=stock,
+    )
+    return len(
+        models.Price.objects.bulk_upsert(objs, unique_fields=["stock", "timestamp"])
+    )
+
+
+def refresh_prices(stock: models.Stock) -> int:
+    """Fetches and stores the bars after a stock's latest price, then advances
+    its indicators by them instead of recomputing two years of history.
+
+    Args:
+        stock (models.Stock): Stock to refresh
+
+    Returns:
+        int: Number of new bars
+    """
+    latest = models.Price.objects.filter(stock=stock).aggregate(
+        latest=Max("timestamp")
+    )["latest"]
+    prices = get_yahoo_stock_price(stock.ticker, since=latest)
+    if prices is None:
+        return 0
+    prices = prices.dropna()
+    if latest is not None:
+        prices = prices[prices["timestamp"] > latest]
+    if prices.empty:
+        return 0
+    # One transaction, so bars are never stored without advancing the
+    # indicators by them, which the next refresh could not detect
+    with transaction.atomic():
+        save_prices(stock, prices)
+        indicators.append_bars(stock.pk, zip(prices["timestamp"], prices["close"]))
+    return len(prices)
+
+
+def get_price_series(
+    stock_id: int, start: datetime, end: datetime, interval: str = "day"
+) -> list[tuple]:
+    """Reads a stock's prices between two instants, resampled in SQL.
+
+    Args:
+        stock_id (int): Primary key of the stock
+        start (datetime): Earliest timestamp, inclusive
+        end (datetime): Latest timestamp, exclusive
+        interval (str, optional): One of ("day", "week", "month"). Defaults to "day".
+
+    Returns:
+        list[tuple]: (timestamp, open, high, low, close) rows in time order
+    """
+    prices = models.Price.objects.filter(
+        stock_id=stock_id, timestamp__gte=start, timestamp__lt=end
+    )
+    if interval == "day":
+        return list(
+            prices.order_by("timestamp").values_list(
+                "timestamp", "open", "high", "low", "close"
+            )
+        )
+
+    # Postgres has no first/last aggregates, so the open and close of each
+    # bucket are taken from its time-ordered arrays.
+    buckets = (
+        prices.annotate(bucket=Trunc("timestamp", interval))
+        .values("bucket")
+        .annotate(
+            opens=ArrayAgg("open", ordering=F("timestamp").asc()),
+            high_=Max("high"),
+            low_=Min("low"),
+            closes=ArrayAgg("close", ordering=F("timestamp").asc()),
+        )
+        .order_by("bucket")
+        .values_list("bucket", "opens", "high_", "low_", "closes")
+    )
+    return [
+        (bucket, opens[0], high, low, closes[-1])
+        for bucket, opens, high, low, closes in buckets
+    ]
+
+
+def save_reddit_posts(stock: models.Stock, posts: pd.DataFrame) -> int:
+    """Upserts a DataFrame of posts from `get_reddit_posts`, keyed on the Reddit post id."""
+    objs = models.Reddit.objects.from_dataframe(
+        posts,
+        dict(
+            api_id="api_id",
+            title="title",
+            content="content",
+            timestamp="timestamp",
+            author="author",
+            sentiment="sentiment",
+            score="score",
+            num_comments="num_comments",
+            url="url",
+        ),
+        stock=stock,
+    )
+    return len(models.Reddit.objects.bulk_upsert(objs, unique_fields=["api_id"]))
+
+
+def save_tweets(stock: models.Stock, tweets: pd.DataFrame) -> int:
+    """Upserts a DataFrame of tweets from `get_tweets`, keyed on the tweet id."""
+    objs = models.Tweet.objects.from_dataframe(
+        tweets,
+        dict(
+            api_id="id",
+            content="text",
+            timestamp="created_at",
+            author="username",
+            url="url",
+            sentiment="sentiment",
+            retweets="retweet_count",
+            replies="reply_count",
+            likes="like_count",
+            quotes="quote_count",
+            pub_score="pub_score",
+            hashtags="hashtags",
+        ),
+        stock=stock,
+    )
+    return len(models.Tweet.objects.bulk_upsert(objs, unique_fields=["api_id"]))
+
+
+def save_news(stock: models.Stock, news: pd.DataFrame) -> int:
+    """Upserts a DataFrame of articles from `get_news`, keyed on the article url."""
+    objs = models.News.objects.from_dataframe(
+        news.assign(date=news["date"].apply(parse)),
+        dict(
+            url="link",
+            headline="title",
+            timestamp="date",
+            sentiment="sentiment",
+            source="source",
+        ),
+        stock=stock,
+    )
+    return len(models.News.objects.bulk_upsert(objs, unique_fields=["url"]))
+
+
+SENTIMENT_SOURCES = {
+    models.SentimentSourceChoices.TWEET: models.Tweet,
+    models.SentimentSourceChoices.REDDIT: models.Reddit,
+    models.SentimentSourceChoices.NEWS: models.News,
+}
+
+
+def refresh_sentiment_counts(source: str, stock_ids: Optional[Iterable[int]] = None):
+    """Rebuilds the daily and all-time sentiment counts of a source from its rows.
+
+    Args:
+        source (str): One of ("tweet", "reddit", "news")
+        stock_ids (Iterable[int], optional): Stocks to refresh. Defaults to all stocks.
+    """
+    rows = SENTIMENT_SOURCES[source].objects.all()
+    counts = models.SentimentCount.objects.filter(source=source)
+    totals = models.SentimentTotal.objects.filter(source=source)
+    if stock_ids is not None:
+        stock_ids = list(stock_ids)
+        rows = rows.filter(stock_id__in=stock_ids)
+        counts = counts.filter(stock_id__in=stock_ids)
+        totals = totals.filter(stock_id__in=stock_ids)
+
+    daily = [
+        models.SentimentCount(source=source, **row)
+        for row in rows.annotate(day=TruncDate("timestamp"))
+        .values("stock_id", "day")
+        .annotate(
+            **{
+                sentiment: Count("pk", filter=Q(sentiment=sentiment))
+                for sentiment in models.SentimentChoices.values
+            }
+        )
+        .order_by()
+    ]
+    overall = {}
+    for count in daily:
+        total = overall.setdefault(
+            count.stock_id,
+            models.SentimentTotal(stock_id=count.stock_id, source=source),
+        )
+        for sentiment in models.SentimentChoices.values:
+            setattr(
+                total, sentiment, getattr(total, sentiment) + getattr(count, sentiment)
             )
 
-            if stock:
-                stock_data = get_yahoo_stock_price(ticker)
-                for _, _open, high, low, close, timestamp in stock_data.itertuples():
-                    models.Price.objects.update_or_create(
-                        timestamp=timestamp,
-                        stock=stock,
-                        defaults=dict(open=_open, high=high, low=low, close=close),
-                    )
-                calculate_indices(stock)
-            stock = models.Stock.objects.filter(ticker=ticker)
+    with transaction.atomic():
+        counts.delete()
+        totals.delete()
+        models.SentimentCount.objects.bulk_upsert(
+            daily, unique_fields=["stock", "source", "day"]
+        )
+        models.SentimentTotal.objects.bulk_upsert(
+            list(overall.values()), unique_fields=["stock", "source"]
+        )
+
+
+def get_stock_from_yahoo(search: str) -> QuerySet:
+    ticker = get_ticker_lookups().resolve(search)
+    if not ticker:
+        return models.Stock.objects.none()
+    return get_or_ingest_stock(ticker)
+
+
+def get_or_ingest_stock(ticker: str) -> QuerySet:
+    """Returns the stock with a ticker, ingesting it from Yahoo first if it is
+    not in the database yet.
+
+    Args:
+        ticker (str): Ticker symbol known to Yahoo
+
+    Returns:
+        QuerySet: The stock, stored under Yahoo's spelling of the ticker
+    """
+    stock = models.Stock.objects.filter(ticker=ticker)
+    if not stock.exists():
+        # Concurrent searches for the same new ticker wait for the first one
+        # to ingest it, then find it in the database.
+        with locks.single_flight(f"ingest:{ticker}"):
+            if not stock.exists():
+                stock = models.Stock.objects.filter(pk=ingest_stock(ticker).pk)
+    return stock
+
+
+def ingest_stock(ticker: str):
+    """Creates a stock from its Yahoo summary and price history. The stock only
+    becomes visible together with its prices and indicators. Its logo is
+    looked up afterwards by a job.
+
+    Args:
+        ticker (str): Ticker symbol as returned by Yahoo autocomplete
+
+    Returns:
+        models.Stock: The stock, whose ticker is the one Yahoo's summary reports
+    """
+    # The summary and price history are independent, so the requests overlap
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        prices = pool.submit(get_yahoo_stock_price, ticker)
+        data = get_yahoo_stock_data(ticker)
+        stock_data = prices.result()
+    with transaction.atomic():
+        stock, _ = models.Stock.objects.update_or_create(
+            ticker=data["ticker"],
+            defaults=dict(name=data["name"], summary=data["summary"]),
+        )
+        if stock_data is not None:
+            save_prices(stock, stock_data)
+        calculate_indices(stock)
     return stock
 
 
+def get_subreddit_posts(ticker: str) -> pd.DataFrame:
+    # PRAW clients are not thread-safe, so both subreddits share one thread
+    return pd.concat(
+        [
+            get_reddit_posts(subreddit, ticker)
+            for subreddit in ["wallstreetbets", "superstonk"]
+        ]
+    )
+
+
+def fetch_timed(fetch, ticker: str) -> tuple[pd.DataFrame, float]:
+    start = time.perf_counter()
+    try:
+        return fetch(ticker), time.perf_counter() - start
+    finally:
+        # Scoring may read the persistent sentiment cache from this thread
+        connection.close()
+
+
+def ingest_social_data(stock: models.Stock) -> dict:
+    """Collects Reddit posts, tweets and news for a stock concurrently and saves
+    them. A failing source is logged and reported without affecting the others.
+
+    Args:
+        stock (models.Stock): Stock to collect for
+
+    Returns:
+        dict: Per source, the rows saved and seconds spent fetching and scoring,
+            or the error that stopped it
+
+    Raises:
+        RuntimeError: If every source failed
+    """
+    sources = {
+        "reddit": (get_subreddit_posts, save_reddit_posts),
+        "twitter": (get_tweets, save_tweets),
+        "news": (get_news, save_news),
+    }
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = {
+            name: pool.submit(fetch_timed, fetch, stock.ticker)
+            for name, (fetch, _) in sources.items()
+        }
+
+    report = {}
+    for name, future in futures.items():
+        try:
+            data, seconds = future.result()
+            rows = sources[name][1](stock, data)
+        except Exception as e:
+            logger.exception("Collecting %s for %s failed", name, stock.ticker)
+            report[name] = {"error": repr(e)}
+        else:
+            report[name] = {"rows": rows, "seconds": round(seconds, 3)}
+    if all("error" in result for result in report.values()):
+        raise RuntimeError(f"Every source failed for {stock.ticker}: {report}")
+    return report
+
+
 # REDDIT SERVICES
 def get_reddit_posts(subreddit, symb, time="week") -> pd.DataFrame:
     """Fetches reddit posts and relevant information sentiment score.
@@ -204,6 +535,7 @@ def get_reddit_posts(subreddit, symb, time="week") -> pd.DataFrame:
         DataFrame: Pandas df
     """
     posts = []
+    throttle.get_limiter("reddit").acquire()
     for post in reddit.subreddit(subreddit).search(symb, time_filter=time):
         if post.is_self:
             posts.append(
@@ -212,7 +544,6 @@ def get_reddit_posts(subreddit, symb, time="week") -> pd.DataFrame:
                     post.selftext,
                     datetime.fromtimestamp(post.created, tz=utc),
                     post.author.name,
-                    get_sentiment(post.selftext),
                     post.score,
                     post.num_comments,
                     post.url,
@@ -226,13 +557,13 @@ def get_reddit_posts(subreddit, symb, time="week") -> pd.DataFrame:
             "content",
             "timestamp",
             "author",
-            "sentiment",
             "score",
             "num_comments",
             "url",
             "api_id",
         ],
     )
+    df.insert(4, "sentiment", get_sentiments(df["content"]))
     # remove rows with empty strings/null
     df.replace("", np.nan, inplace=True)
     df.dropna(inplace=True)
@@ -240,10 +571,16 @@ def get_reddit_posts(subreddit, symb, time="week") -> pd.DataFrame:
 
 
 def get_image_url(query):
-    params = {"q": query, "tbm": "isch", "ijn": "0", "api_key": config.google_api_key}
+    params = {
+        "engine": "google",
+        "output": "json",
+        "q": query,
+        "tbm": "isch",
+        "ijn": "0",
+        "api_key": config.google_api_key,
+    }
 
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    results = http.get("serpapi", config.serpapi_url, params=params).json()
     suggested = results.get("suggested_searches")
     if suggested:
         image_url = [result for result in suggested if result["name"] == "logo"]
@@ -263,6 +600,7 @@ def get_tweets(query) -> pd.DataFrame:
         pd.DataFrame: DataFrame of tweets and other relevant information.
     """
     query = f"\\${query} lang:en"
+    throttle.get_limiter("twitter").acquire()
     tweets = twitter.search_recent_tweets(
         query=query,
         tweet_fields=["author_id", "created_at", "public_metrics", "entities"],
@@ -295,9 +633,10 @@ def get_tweets(query) -> pd.DataFrame:
     tweets_df["pub_score"] = tweets_df[
         ["retweet_count", "reply_count", "like_count", "quote_count"]
     ].sum(axis=1)
-    tweets_df["sentiment"] = tweets_df["text"].apply(get_sentiment)
+    tweets_df["sentiment"] = get_sentiments(tweets_df["text"])
 
     # get usernames
+    throttle.get_limiter("twitter").acquire()
     users = pd.DataFrame(
         [
             {"username": x.username, "author_id": x.id}
@@ -332,7 +671,7 @@ def get_news(search_term, data_filter=None) -> pd.DataFrame:
         return x[start:end]
 
     url = clean_url(search_term, data_filter)
-    response = requests.get(url)
+    response = http.get("news", url)
     # get the root directly as we have text file of string now
     root = ET.fromstring(response.text)
     # get the required data
@@ -356,7 +695,7 @@ def get_news(search_term, data_filter=None) -> pd.DataFrame:
     )
     # adjust the date column
     # df["date"] = df["date"].astype("datetime64")
-    df["sentiment"] = df["title"].apply(get_sentiment)
+    df["sentiment"] = get_sentiments(df["title"])
     return df
 
 
@@ -388,14 +727,24 @@ def clean_url(searched_item, data_filter):
     else:
         time = ""
     url = (
-        f"https://news.google.com/rss/search?q={searched_item}+"
-        + time
-        + "&hl=en-US&ceid=US%3Aen"
+        f"{config.google_news_url}?q={searched_item}+" + time + "&hl=en-US&ceid=US%3Aen"
     )
     return url
 
 
 # OTHERS
+# VADER loads its lexicon from disk on construction, so a single analyzer is
+# created on first use and shared by every call.
+_analyzer = None
+
+
+def get_analyzer() -> SentimentIntensityAnalyzer:
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
 def get_sentiment(text):
     """Returns a discrete value (pos/neg/neutral) describing the sentiment of a given input text.
 
@@ -405,17 +754,153 @@ def get_sentiment(text):
     Returns:
         str: One of ("positive", "negative", "neutral")
     """
+    return get_sentiments([text])[0]
+
+
+class SentimentCache:
+    """Bounded LRU of sentiment labels keyed on a digest of the cleaned text.
+
+    When `persistent` is set, misses fall through to the SentimentScore table,
+    which shares labels between processes and across restarts.
+    """
+
+    def __init__(self, maxsize: int, persistent: bool = False):
+        self.maxsize = maxsize
+        self.persistent = persistent
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._labels = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, digests: list[str]) -> dict[str, str]:
+        found = {}
+        with self._lock:
+            for digest in digests:
+                if digest in self._labels:
+                    self._labels.move_to_end(digest)
+                    found[digest] = self._labels[digest]
+        self.hits += sum(digest in found for digest in digests)
+        missing = set(digests) - found.keys()
+        if self.persistent and missing:
+            stored = dict(
+                models.SentimentScore.objects.filter(digest__in=missing).values_list(
+                    "digest", "sentiment"
+                )
+            )
+            self._remember(stored)
+            self.persistent_hits += sum(digest in stored for digest in digests)
+            found.update(stored)
+        self.misses += sum(digest not in found for digest in digests)
+        return found
+
+    def set_many(self, labels: dict[str, str]):
+        self._remember(labels)
+        if self.persistent and labels:
+            models.SentimentScore.objects.bulk_create(
+                [
+                    models.SentimentScore(digest=digest, sentiment=sentiment)
+                    for digest, sentiment in labels.items()
+                ],
+                ignore_conflicts=True,
+            )
+
+    def _remember(self, labels: dict[str, str]):
+        with self._lock:
+            self._labels.update(labels)
+            for digest in labels:
+                self._labels.move_to_end(digest)
+            while len(self._labels) > self.maxsize:
+                self._labels.popitem(last=False)
+
+    def forget(self, digests: list[str]):
+        """Drops the labels of the given digests, including the persistent tier."""
+        with self._lock:
+            for digest in digests:
+                self._labels.pop(digest, None)
+        if self.persistent:
+            models.SentimentScore.objects.filter(digest__in=digests).delete()
+
+    def clear(self):
+        """Drops every cached label, including the persistent tier."""
+        with self._lock:
+            self._labels.clear()
+        if self.persistent:
+            models.SentimentScore.objects.all().delete()
+
+    def info(self) -> dict:
+        return dict(
+            hits=self.hits,
+            persistent_hits=self.persistent_hits,
+            misses=self.misses,
+            size=len(self._labels),
+            maxsize=self.maxsize,
+        )
+
+
+_sentiment_cache = None
+
+
+def get_sentiment_cache() -> SentimentCache:
+    global _sentiment_cache
+    if _sentiment_cache is None:
+        _sentiment_cache = SentimentCache(
+            maxsize=config.sentiment_cache_size,
+            persistent=config.sentiment_cache_persistent,
+        )
+    return _sentiment_cache
+
+
+def sentiment_digest(text: str) -> str:
+    """Returns the key a text's label is cached under, a hash of the text
+    cleaned with `cleanTxt` and with its whitespace collapsed.
+
+    Args:
+        text (str): Input text
+    """
+    text = " ".join(cleanTxt(text).split())
+    return hashlib.sha1(text.encode()).hexdigest()
 
-    # Iterating over the tweets in the dataframe
-    analyzer = SentimentIntensityAnalyzer().polarity_scores(text)
-    neg = analyzer["neg"]
-    pos = analyzer["pos"]
+
+def get_sentiments(texts: Iterable[str], use_cache: bool = True) -> list[str]:
+    """Returns the discrete sentiment of each of the given texts, in order.
+    Labels are cached by `sentiment_digest`, so the same headline or retweet is
+    only scored once while it stays in the cache. The original text is scored.
+
+    Args:
+        texts (Iterable[str]): Input texts to analyze.
+        use_cache (bool, optional): Look up and store labels in the sentiment cache. Defaults to True.
+
+    Returns:
+        list[str]: One of ("positive", "negative", "neutral") per text
+    """
+    texts = list(texts)
+    if not use_cache:
+        return [score_sentiment(text) for text in texts]
+
+    digests = [sentiment_digest(text) for text in texts]
+    cache = get_sentiment_cache()
+    labels = cache.get_many(digests)
+    scored = {
+        digest: score_sentiment(text)
+        for digest, text in zip(digests, texts)
+        if digest not in labels
+    }
+    cache.set_many(scored)
+    labels.update(scored)
+    return [labels[digest] for digest in digests]
+
+
+def score_sentiment(text: str) -> str:
+    scores = get_analyzer().polarity_scores(text)
+    neg = scores["neg"]
+    pos = scores["pos"]
 
     if neg > pos:
         return "negative"
     elif pos > neg:
         return "positive"
-    elif pos == neg:
+    else:
         return "neutral"
 
 
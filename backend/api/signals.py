@@ -1,66 +1,116 @@
-import pandas as pd
-from dateutil.parser import parse
-from django.db.models.signals import post_save
+import threading
+import weakref
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from . import models, services
+from models import post_bulk_upsert
+
+from . import cache, jobs, models, search, services
+
+# Tables whose rows are served by cached per-stock endpoints
+CACHED_MODELS = [
+    models.Price,
+    models.Indicator,
+    models.IndicatorValue,
+    models.Tweet,
+    models.Reddit,
+    models.News,
+    models.SentimentTotal,
+]
+
+SENTIMENT_MODELS = {
+    model: source for source, model in services.SENTIMENT_SOURCES.items()
+}
 
 
 @receiver(post_save, sender=models.Stock)
 def handle_stock_post_save(instance: models.Stock, created: bool, **kwargs):
     if created:
-        # Add Reddit
-        df = pd.DataFrame()
-        for subreddit in ["wallstreetbets", "superstonk"]:
-            data = services.get_reddit_posts(subreddit, instance.ticker)
-            df = pd.concat([df, data])
-        for args in df.itertuples(index=False):
-            models.Reddit.objects.update_or_create(
-                api_id=args.api_id,
-                defaults=dict(
-                    title=args.title,
-                    content=args.content,
-                    timestamp=args.timestamp,
-                    author=args.author,
-                    sentiment=args.sentiment,
-                    score=args.score,
-                    num_comments=args.num_comments,
-                    url=args.url,
-                    stock=instance,
-                ),
-            )
-
-        # Add Twitter
-        df = services.get_tweets(instance.ticker)
-        for args in df.itertuples(index=False):
-            models.Tweet.objects.update_or_create(
-                api_id=args.id,
-                defaults=dict(
-                    content=args.text,
-                    timestamp=args.created_at,
-                    author=args.username,
-                    url=args.url,
-                    sentiment=args.sentiment,
-                    retweets=args.retweet_count,
-                    replies=args.reply_count,
-                    likes=args.like_count,
-                    quotes=args.quote_count,
-                    pub_score=args.pub_score,
-                    hashtags=args.hashtags,
-                    stock=instance,
-                ),
-            )
-
-        # Add News
-        df = services.get_news(instance.ticker)
-        for args in df.itertuples(index=False):
-            models.News.objects.update_or_create(
-                url=args.link,
-                defaults=dict(
-                    headline=args.title,
-                    timestamp=parse(args.date),
-                    sentiment=args.sentiment,
-                    source=args.source,
-                    stock=instance,
-                ),
-            )
+        jobs.enqueue("ingest_social_data", stock=instance, stock_id=instance.pk)
+        jobs.enqueue("update_logo", stock=instance, stock_id=instance.pk)
+    transaction.on_commit(lambda: forget_stock(instance.ticker))
+    transaction.on_commit(lambda: search.index_stock(instance))
+
+
+@receiver(post_delete, sender=models.Stock)
+def handle_stock_post_delete(instance: models.Stock, **kwargs):
+    transaction.on_commit(lambda: forget_stock(instance.ticker))
+    transaction.on_commit(lambda: search.unindex_stock(instance.pk))
+
+
+def forget_stock(ticker: str):
+    cache.forget_stock_id(ticker)
+    cache.invalidate(ticker)
+
+
+def invalidate_stocks(stock_ids: set[int]):
+    # Cached responses are dropped once the changes commit, since a response
+    # rebuilt in between would be cached under the new version without them
+    tickers = list(
+        models.Stock.objects.filter(pk__in=stock_ids).values_list("ticker", flat=True)
+    )
+
+    def invalidate():
+        for ticker in tickers:
+            cache.invalidate(ticker)
+
+    transaction.on_commit(invalidate)
+
+
+def handle_cached_post_save(sender, instance, **kwargs):
+    if sender in SENTIMENT_MODELS:
+        services.refresh_sentiment_counts(SENTIMENT_MODELS[sender], [instance.stock_id])
+    invalidate_stocks({instance.stock_id})
+
+
+for model in CACHED_MODELS:
+    post_save.connect(handle_cached_post_save, sender=model)
+
+
+@receiver(post_bulk_upsert)
+def handle_cached_post_bulk_upsert(sender, objs: list, **kwargs):
+    stock_ids = {obj.stock_id for obj in objs}
+    if sender in SENTIMENT_MODELS:
+        services.refresh_sentiment_counts(SENTIMENT_MODELS[sender], stock_ids)
+    if sender in CACHED_MODELS:
+        invalidate_stocks(stock_ids)
+
+
+class RecountBatch:
+    """Stocks per source to recount once the deleting transaction commits."""
+
+    def __init__(self):
+        self.stock_ids = defaultdict(set)
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        for source, stock_ids in self.stock_ids.items():
+            services.refresh_sentiment_counts(source, stock_ids)
+
+
+# Weak reference to the batch of the current transaction. Only the on_commit
+# hook holds the batch, so the reference dies when the transaction (or the
+# savepoint that scheduled it) rolls back and Django drops the hook.
+_deleted = threading.local()
+
+
+def handle_sentiment_post_delete(sender, instance, **kwargs):
+    # A cascade sends post_delete for every row, so rows are recounted once
+    # per stock and source after the transaction commits rather than per row.
+    batch = getattr(_deleted, "batch", lambda: None)()
+    scheduled = batch is not None and not batch.done
+    if not scheduled:
+        batch = RecountBatch()
+        _deleted.batch = weakref.ref(batch)
+    batch.stock_ids[SENTIMENT_MODELS[sender]].add(instance.stock_id)
+    if not scheduled:
+        # Outside a transaction this runs at once
+        transaction.on_commit(batch)
+
+
+for model in SENTIMENT_MODELS:
+    post_delete.connect(handle_sentiment_post_delete, sender=model)
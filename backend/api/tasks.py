@@ -0,0 +1,12 @@
+from . import logos, models, services
+from .jobs import task
+
+
+@task
+def ingest_social_data(stock_id: int):
+    return services.ingest_social_data(models.Stock.objects.get(pk=stock_id))
+
+
+@task
+def update_logo(stock_id: int):
+    return logos.update_logo(models.Stock.objects.get(pk=stock_id))
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connection
+from django.utils.timezone import now
+from ninja.errors import HttpError
+
+from api import models, schemas
+from api.api import FEED_ORDER
+from schemas import after, cursor_paginate, encode_cursor
+
+FEEDS = [models.Reddit, models.Tweet, models.News]
+
+
+@pytest.fixture
+def no_seqscan(db):
+    # On an empty table a sequential or bitmap scan followed by a sort is
+    # cheapest, which would hide whether the index can serve the order
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+
+def feed(model, cursor: bool):
+    qs = model.objects.filter(stock_id=1).order_by(*FEED_ORDER)
+    if cursor:
+        qs = qs.filter(after(FEED_ORDER, [now(), 1]))
+    return qs[:11]
+
+
+@pytest.mark.parametrize("cursor", [False, True], ids=["page", "cursor"])
+@pytest.mark.parametrize("model", FEEDS, ids=lambda model: model.__name__)
+def test_feed_uses_index(no_seqscan, model, cursor):
+    plan = feed(model, cursor).explain()
+    assert (
+        f"Index Scan Backward using {model.__name__.lower()}_stock_timestamp_id_idx"
+        in plan
+    )
+    assert "Sort" not in plan
+
+
+@pytest.mark.parametrize(
+    "values",
+    [[123, 1], ["x", "abc"], ["2023-01-01T00:00:00+00:00", "abc"], [[1], {}]],
+)
+def test_cursor_of_wrong_types_is_rejected(db, values):
+    with pytest.raises(HttpError) as e:
+        cursor_paginate(
+            models.News.objects.all(),
+            schemas.News,
+            encode_cursor(values),
+            order_by=FEED_ORDER,
+        )
+    assert e.value.status_code == 400
@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+from ta.trend import MACD, EMAIndicator, SMAIndicator
+
+from api import indicators, models
+
+# Bars of each stock in the test matrix: enough for every window, fewer than
+# the longest windows, and fewer than the MACD signal needs
+LENGTHS = [300, 150, 30]
+
+
+def reference(closes: np.ndarray) -> dict[str, pd.Series]:
+    close = pd.Series(closes)
+    return {
+        **{
+            f"sma_{w}": SMAIndicator(close, w).sma_indicator()
+            for w in indicators.SMA_WINDOWS
+        },
+        **{
+            f"ema_{w}": EMAIndicator(close, w).ema_indicator()
+            for w in indicators.SMA_WINDOWS
+        },
+        "macd_diff": MACD(close).macd_diff(),
+        "rsi": RSIIndicator(close).rsi(),
+    }
+
+
+@pytest.fixture
+def closes() -> np.ndarray:
+    # Right-aligned like `load_closes`, with shorter histories padded with NaN
+    rng = np.random.default_rng(0)
+    matrix = np.full((len(LENGTHS), max(LENGTHS)), np.nan)
+    for i, n in enumerate(LENGTHS):
+        matrix[i, -n:] = 100 + np.cumsum(rng.normal(size=n))
+    return matrix
+
+
+def to_state(state: dict[str, np.ndarray], i: int) -> models.IndicatorState:
+    return models.IndicatorState(
+        closes=[c for c in state["closes"][i].tolist() if not math.isnan(c)],
+        **{key: v[i].item() for key, v in state.items() if key != "closes"},
+    )
+
+
+def test_compute_matches_ta(closes):
+    series, _ = indicators.compute(closes)
+    for i, n in enumerate(LENGTHS):
+        for name, expected in reference(closes[i, -n:]).items():
+            np.testing.assert_allclose(
+                series[name][i, -n:], expected, rtol=1e-9, equal_nan=True, err_msg=name
+            )
+
+
+@pytest.mark.parametrize("new_bars", [1, 10])
+def test_advance_matches_ta(closes, new_bars):
+    _, state = indicators.compute(closes[:, :-new_bars])
+    for i, n in enumerate(LENGTHS):
+        stock_state = to_state(state, i)
+        for close in closes[i, -new_bars:]:
+            values = indicators.advance(stock_state, float(close))
+        for name, expected in reference(closes[i, -n:]).items():
+            np.testing.assert_allclose(
+                values[name], expected.iloc[-1], rtol=1e-9, equal_nan=True, err_msg=name
+            )
@@ -0,0 +1,42 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.db import connection
+
+from api import models, services
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_ingestions_of_a_ticker_fetch_once():
+    def get_yahoo_stock_data(ticker):
+        # Long enough for every caller to find the stock missing
+        time.sleep(0.2)
+        return dict(name="Newco", ticker=ticker, summary="")
+
+    results = []
+    barrier = threading.Barrier(8)
+
+    def search():
+        try:
+            barrier.wait()
+            results.append(list(services.get_or_ingest_stock("NWCO")))
+        finally:
+            connection.close()
+
+    with mock.patch.object(
+        services, "get_yahoo_stock_data", side_effect=get_yahoo_stock_data
+    ) as data, mock.patch.object(
+        services, "get_yahoo_stock_price", return_value=None
+    ) as prices:
+        threads = [threading.Thread(target=search) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    data.assert_called_once_with("NWCO")
+    prices.assert_called_once_with("NWCO")
+    assert models.Stock.objects.filter(ticker="NWCO").count() == 1
+    assert [[stock.ticker for stock in result] for result in results] == [["NWCO"]] * 8
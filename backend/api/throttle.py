@@ -0,0 +1,89 @@
+import threading
+import time
+
+from dataprod.config import Config, config
+
+config: Config
+
+
+class RateLimiter:
+    """Token bucket shared between threads: allows bursts of up to `burst`
+    calls, refilled at `rate` calls per second. Callers beyond the rate queue
+    in `acquire` until a token is free."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.waiting = 0
+        self.waited = 0.0
+        self.max_waited = 0.0
+        self.retries = 0
+        self.rejected = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Blocks until a call is allowed.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        with self.lock:
+            self.waiting += 1
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.waiting -= 1
+                    self.calls += 1
+                    self.waited += waited
+                    self.max_waited = max(self.max_waited, waited)
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def record(self, retried: bool = False, rejected: bool = False):
+        """Counts a retried call, or one the provider rejected for exceeding its quota."""
+        with self.lock:
+            self.retries += retried
+            self.rejected += rejected
+
+    def info(self) -> dict:
+        with self.lock:
+            return dict(
+                rate=self.rate,
+                calls=self.calls,
+                waiting=self.waiting,
+                waited=round(self.waited, 3),
+                max_waited=round(self.max_waited, 3),
+                retries=self.retries,
+                rejected=self.rejected,
+            )
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> RateLimiter:
+    """Returns the process-wide limiter of an external API, created on first use
+    with the rate configured for it in `rate_limits`."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(config.rate_limits.get(provider, 1))
+        return _limiters[provider]
+
+
+def info() -> dict[str, dict]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {provider: limiter.info() for provider, limiter in limiters.items()}
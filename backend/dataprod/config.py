@@ -33,16 +33,58 @@ class Config(BaseSettings):
     database_port: int = 5432
 
     yahoo_finance_header_key: str
+    yahoo_finance_url: str = "https://yh-finance.p.rapidapi.com"
 
     reddit_client_id: str
     reddit_client_secret: str
     reddit_user_agent: str
 
     google_api_key: str
+    serpapi_url: str = "https://serpapi.com/search"
+    google_news_url: str = "https://news.google.com/rss/search"
     twitter_api_key: str
     twitter_api_secret: str
     twitter_bearer_token: str
 
+    # One of "locmem", "file" or "redis". `cache_location` is the directory for
+    # the file backend and the server URL for redis. Jobs write from the worker
+    # process, so the web process only sees their invalidations through a
+    # shared backend; "locmem" is only suitable without a worker.
+    cache_backend: str = "file"
+    cache_location: str = ""
+    cache_timeout: int = 300
+
+    # Seconds before an external API call is abandoned, and the number of
+    # keep-alive connections kept per host
+    http_timeout: float = 10
+    http_pool_size: int = 10
+    # Retries of 429s, 5xx responses and connection errors, waiting
+    # `http_backoff` seconds and doubling after each attempt
+    http_max_retries: int = 3
+    http_backoff: float = 1
+
+    # Calls per second allowed to each external API, as JSON in the environment
+    rate_limits: dict[str, float] = {
+        "yahoo": 5,
+        "serpapi": 1,
+        "news": 2,
+        "reddit": 1,
+        "twitter": 1,
+        "images": 5,
+    }
+
+    # Seconds before the in-memory stock search index is rebuilt, picking up
+    # stocks added by other processes
+    search_index_ttl: int = 300
+
+    # Seconds a search resolved to a ticker by Yahoo autocomplete is reused,
+    # and the shorter time a search that resolved to nothing is
+    ticker_lookup_ttl: int = 7 * 24 * 60 * 60
+    ticker_lookup_negative_ttl: int = 24 * 60 * 60
+
+    sentiment_cache_size: int = 100_000
+    sentiment_cache_persistent: bool = False
+
 
 # Lazily initialize the config variable using module-level __getattr__
 # so that we can import the Config class without triggering config load.
@@ -0,0 +1,46 @@
+import os
+from urllib.parse import urlparse
+
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+
+class MediaWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise middleware that also serves MEDIA_ROOT under MEDIA_URL.
+
+    Media files are named by a hash of their content, so they are served with
+    far-future cache headers. Files written after startup, possibly by another
+    process, are picked up on their first request.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        # Set before the parent adds the static files, which tests each of
+        # them with `immutable_file_test`
+        self.media_prefix = ensure_leading_trailing_slash(
+            urlparse(settings.MEDIA_URL).path
+        )
+        self.media_root = os.path.abspath(settings.MEDIA_ROOT)
+        super().__init__(get_response, settings)
+        if self.autorefresh or os.path.isdir(self.media_root):
+            self.add_files(self.media_root, prefix=self.media_prefix)
+
+    def __call__(self, request):
+        url = request.path_info
+        if (
+            not self.autorefresh
+            and url.startswith(self.media_prefix)
+            and url not in self.files
+            and self.url_is_canonical(url)
+        ):
+            path = os.path.join(self.media_root, url[len(self.media_prefix) :])
+            if self.path_is_child_of(path, self.media_root + os.sep) and os.path.isfile(
+                path
+            ):
+                self.add_file_to_dictionary(url, path)
+        return super().__call__(request)
+
+    def immutable_file_test(self, path, url):
+        return url.startswith(self.media_prefix) or super().immutable_file_test(
+            path, url
+        )
@@ -1,6 +1,10 @@
 from django.contrib.postgres.search import TrigramWordSimilarity
 from django.db import models
 from django.db.models import Q
+from django.dispatch import Signal
+
+# Sent by BulkUpsertable.bulk_upsert, which bypasses post_save, with the written `objs`
+post_bulk_upsert = Signal()
 
 
 class AccessControlledQuerySet(models.QuerySet):
@@ -24,3 +28,50 @@ class FuzzySearchable(models.QuerySet):
             .filter(**{f"{field}__trigram_word_similar": query})
             .order_by("-similarity")
         )
+
+
+class BulkUpsertable(models.QuerySet):
+    def from_dataframe(self, df, columns: dict[str, str], **fields) -> list:
+        """
+        Builds unsaved instances from the rows of `df`. `columns` maps model field names to DataFrame column names,
+        and `fields` are set on every instance.
+        """
+        return [
+            self.model(**dict(zip(columns, row)), **fields)
+            for row in df[list(columns.values())].itertuples(index=False)
+        ]
+
+    def bulk_upsert(
+        self,
+        objs: list,
+        unique_fields: list[str],
+        update_fields: list[str] = None,
+        batch_size: int = 1000,
+    ) -> list:
+        """
+        Inserts `objs` with a single INSERT ... ON CONFLICT per batch, updating `update_fields` on rows that conflict
+        on `unique_fields`. `update_fields` defaults to every other concrete field. When several objects share the same
+        unique key, only the last one is written, since Postgres rejects updating a row twice in one statement.
+        """
+        opts = self.model._meta
+        if update_fields is None:
+            update_fields = [
+                f.name
+                for f in opts.concrete_fields
+                if not f.primary_key and f.name not in unique_fields
+            ]
+        attnames = [opts.get_field(f).attname for f in unique_fields]
+        objs = list(
+            {tuple(getattr(obj, a) for a in attnames): obj for obj in objs}.values()
+        )
+        if not objs:
+            return []
+        objs = self.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+        post_bulk_upsert.send(sender=self.model, objs=objs)
+        return objs
@@ -1,7 +1,13 @@
-from typing import Generic, Literal, Protocol, TypeVar
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Generic, Literal, Optional, Protocol, TypeVar
 
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
+from ninja.errors import HttpError
 from pydantic import BaseModel
 from pydantic.generics import GenericModel
 
@@ -11,9 +17,10 @@ PaginatedListItem = TypeVar("PaginatedListItem")
 class PaginatedList(GenericModel, Generic[PaginatedListItem]):
     items: list[PaginatedListItem]
     limit: int
-    total: int
-    page: int
-    pages: int
+    total: Optional[int]
+    page: Optional[int]
+    pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class SchemaFactory(Protocol):
@@ -31,15 +38,22 @@ def paginate(
 ):
     """
     If `order_by` is provided, results will be ordered by `order_by`. Otherwise, if `manager_or_qs` is not already
-    ordered, results will be ordered by `default_order_by`, which defaults to `["pk"]`.
+    ordered, results will be ordered by `default_order_by`, which defaults to `["pk"]`. A list is paginated as is.
     """
     if default_order_by is None:
         default_order_by = ["pk"]
-    qs = manager_or_qs if isinstance(manager_or_qs, QuerySet) else manager_or_qs.all()
-    if order_by:
-        qs = qs.order_by(*order_by)
-    elif not qs.query.order_by:
-        qs = qs.order_by(*default_order_by)
+    if isinstance(manager_or_qs, list):
+        qs = manager_or_qs
+    else:
+        qs = (
+            manager_or_qs
+            if isinstance(manager_or_qs, QuerySet)
+            else manager_or_qs.all()
+        )
+        if order_by:
+            qs = qs.order_by(*order_by)
+        elif not qs.query.order_by:
+            qs = qs.order_by(*default_order_by)
     paginator = Paginator(qs, limit)
     page = paginator.get_page(page)
     items = [schema.from_orm(f) for f in page.object_list]
@@ -52,6 +66,90 @@ def paginate(
     )
 
 
+def encode_cursor(values: list) -> str:
+    # isoformat keeps microseconds, which DjangoJSONEncoder would truncate
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HttpError(400, "Invalid cursor")
+
+
+def after(order_by: list[str], values: list) -> Q:
+    """Builds the filter for rows strictly after `values` in `order_by` order,
+    ie. `(a > x) OR (a = x AND b > y) OR ...` with `<` for descending fields."""
+    fields = [field.lstrip("-") for field in order_by]
+    lookups = ["lt" if field.startswith("-") else "gt" for field in order_by]
+    q = Q()
+    for i, (field, lookup, value) in enumerate(zip(fields, lookups, values)):
+        equal = dict(zip(fields[:i], values[:i]))
+        q |= Q(**equal, **{f"{field}__{lookup}": value})
+    # The redundant bound on the leading field lets an index serve the range
+    return Q(**{f"{fields[0]}__{lookups[0]}e": values[0]}) & q
+
+
+def count(qs: QuerySet, mode: Literal["exact", "approximate", "none"]):
+    if mode == "exact":
+        return qs.count()
+    if mode == "approximate":
+        # The planner's row estimate avoids scanning every matching row
+        plan = json.loads(qs.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return None
+
+
+def cursor_paginate(
+    manager_or_qs,
+    schema: SchemaFactory,
+    cursor: str = None,
+    limit: int = 50,
+    order_by: list[str] = None,
+    total: Literal["exact", "approximate", "none"] = "none",
+):
+    """
+    Keyset pagination: each page is fetched with a `WHERE (timestamp, pk) > cursor` filter instead of an `OFFSET`, so
+    every page costs the same regardless of depth. `cursor` is the opaque `next_cursor` of the previous page, or empty
+    for the first page. `order_by` must end in a unique field and defaults to `["timestamp", "pk"]`. Counting matching
+    rows is skipped unless `total` asks for an exact or approximate count.
+    """
+    if order_by is None:
+        order_by = ["timestamp", "pk"]
+    qs = manager_or_qs if isinstance(manager_or_qs, QuerySet) else manager_or_qs.all()
+    total = count(qs, total)
+    page = qs.order_by(*order_by)
+    if cursor:
+        values = decode_cursor(cursor)
+        if not isinstance(values, list) or len(values) != len(order_by):
+            raise HttpError(400, "Invalid cursor")
+        try:
+            # Fields convert the values as the filter is built, so values of
+            # the wrong type fail here rather than in the database
+            page = page.filter(after(order_by, values))
+        except (TypeError, ValueError, ValidationError):
+            raise HttpError(400, "Invalid cursor")
+    # Fetching one extra row tells whether there is a next page
+    objs = list(page[: limit + 1])
+    next_cursor = None
+    if len(objs) > limit:
+        objs = objs[:limit]
+        last = objs[-1]
+        next_cursor = encode_cursor(
+            [getattr(last, field.lstrip("-")) for field in order_by]
+        )
+    return PaginatedList(
+        items=[schema.from_orm(f) for f in objs],
+        limit=limit,
+        total=total,
+        page=None,
+        pages=None,
+        next_cursor=next_cursor,
+    )
+
+
 Data = TypeVar("Data")
 _NOT_SET = object()
 
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import {
   HomeOutlined,
   LikeOutlined,
@@ -25,6 +25,7 @@ import {
   useSentiment,
   useStock,
   useStockIndicator,
+  useStockJobs,
   useStockPrice,
 } from "./api/api";
 import {
@@ -55,6 +56,7 @@ import {
 } from "chart.js";
 import { useDebouncedCallback } from "use-debounce";
 import InfiniteScroll from "react-infinite-scroll-component";
+import { useSWRConfig } from "swr";
 import useSWRInfinite from "swr/infinite";
 import { Candlestick, Matrix } from "./components/typedCharts";
 import "chartjs-adapter-date-fns";
@@ -346,8 +348,9 @@ const Tweets = ({ stock }: { stock: Stock }) => {
     pageIndex: number,
     previousPageData: PaginatedList<Tweet>,
   ) => {
-    if (previousPageData && !previousPageData.items.length) return null;
-    return `/api/stock/${stock.ticker}/tweets?page=${pageIndex + 1}`;
+    if (previousPageData && !previousPageData.next_cursor) return null;
+    const cursor = previousPageData?.next_cursor ?? "";
+    return `/api/stock/${stock.ticker}/tweets?cursor=${encodeURIComponent(cursor)}`;
   };
 
   const { data, size, setSize } = useSWRInfinite<PaginatedList<Tweet>>(
@@ -357,12 +360,12 @@ const Tweets = ({ stock }: { stock: Stock }) => {
   );
 
   const [tweets, setTweets] = useState<Tweet[]>([]);
-  const [maxData, setMaxData] = useState(0);
+  const [hasMore, setHasMore] = useState(false);
 
   useEffect(() => {
     if (data) {
       setTweets(data.map((paged) => paged.items).flat());
-      setMaxData(data[0].total);
+      setHasMore(!!data[data.length - 1].next_cursor);
     }
   }, [data]);
 
@@ -382,7 +385,7 @@ const Tweets = ({ stock }: { stock: Stock }) => {
           <InfiniteScroll
             dataLength={tweets.length}
             next={() => setSize(size + 1)}
-            hasMore={tweets.length < maxData}
+            hasMore={hasMore}
             loader={<Skeleton avatar paragraph={{ rows: 1 }} active />}
             endMessage={<Divider plain>End</Divider>}
             scrollableTarget="scrollableDiv"
@@ -468,8 +471,9 @@ const RedditComponent = ({ stock }: { stock: Stock }) => {
     pageIndex: number,
     previousPageData: PaginatedList<Reddit>,
   ) => {
-    if (previousPageData && !previousPageData.items.length) return null;
-    return `/api/stock/${stock.ticker}/reddit?page=${pageIndex + 1}`;
+    if (previousPageData && !previousPageData.next_cursor) return null;
+    const cursor = previousPageData?.next_cursor ?? "";
+    return `/api/stock/${stock.ticker}/reddit?cursor=${encodeURIComponent(cursor)}`;
   };
 
   const { data, size, setSize } = useSWRInfinite<PaginatedList<Reddit>>(
@@ -479,12 +483,12 @@ const RedditComponent = ({ stock }: { stock: Stock }) => {
   );
 
   const [reddit, setReddit] = useState<Reddit[]>([]);
-  const [maxData, setMaxData] = useState(0);
+  const [hasMore, setHasMore] = useState(false);
 
   useEffect(() => {
     if (data) {
       setReddit(data.map((paged) => paged.items).flat());
-      setMaxData(data[0].total);
+      setHasMore(!!data[data.length - 1].next_cursor);
     }
   }, [data]);
 
@@ -504,7 +508,7 @@ const RedditComponent = ({ stock }: { stock: Stock }) => {
           <InfiniteScroll
             dataLength={reddit.length}
             next={() => setSize(size + 1)}
-            hasMore={reddit.length < maxData}
+            hasMore={hasMore}
             loader={<Skeleton avatar paragraph={{ rows: 1 }} active />}
             endMessage={<Divider plain>End</Divider>}
             scrollableTarget="scrollableDiv"
@@ -584,8 +588,9 @@ const RedditComponent = ({ stock }: { stock: Stock }) => {
 
 const NewsComponent = ({ stock }: { stock: Stock }) => {
   const getKey = (pageIndex: number, previousPageData: PaginatedList<News>) => {
-    if (previousPageData && !previousPageData.items.length) return null;
-    return `/api/stock/${stock.ticker}/news?page=${pageIndex + 1}`;
+    if (previousPageData && !previousPageData.next_cursor) return null;
+    const cursor = previousPageData?.next_cursor ?? "";
+    return `/api/stock/${stock.ticker}/news?cursor=${encodeURIComponent(cursor)}`;
   };
 
   const { data, size, setSize } = useSWRInfinite<PaginatedList<News>>(
@@ -595,12 +600,12 @@ const NewsComponent = ({ stock }: { stock: Stock }) => {
   );
 
   const [news, setNews] = useState<News[]>([]);
-  const [maxData, setMaxData] = useState(0);
+  const [hasMore, setHasMore] = useState(false);
 
   useEffect(() => {
     if (data) {
       setNews(data.map((paged) => paged.items).flat());
-      setMaxData(data[0].total);
+      setHasMore(!!data[data.length - 1].next_cursor);
     }
   }, [data]);
 
@@ -620,7 +625,7 @@ const NewsComponent = ({ stock }: { stock: Stock }) => {
           <InfiniteScroll
             dataLength={news.length}
             next={() => setSize(size + 1)}
-            hasMore={news.length < maxData}
+            hasMore={hasMore}
             loader={<Skeleton avatar paragraph={{ rows: 1 }} active />}
             endMessage={<Divider plain>End</Divider>}
             scrollableTarget="scrollableDiv"
@@ -727,6 +732,20 @@ const Profile = ({ stock }: { stock: Stock }) => {
 
 const Dashboard = ({ ticker }: { ticker: string }) => {
   var { stock } = useStock(ticker);
+  const { pending } = useStockJobs(ticker);
+  const { mutate } = useSWRConfig();
+  const wasPending = useRef(false);
+  // Bumped to remount the sentiment charts and feeds, which refetches them
+  const [generation, setGeneration] = useState(0);
+
+  useEffect(() => {
+    // Background jobs fill in the feeds, sentiment and logo of a new stock
+    if (wasPending.current && !pending) {
+      mutate(`/api/stock/${ticker}`);
+      setGeneration((generation) => generation + 1);
+    }
+    wasPending.current = pending;
+  }, [pending, ticker, mutate]);
 
   if (!stock) {
     return <div>Please Select a Stock</div>;
@@ -743,14 +762,22 @@ const Dashboard = ({ ticker }: { ticker: string }) => {
       </Space>
 
       <Space style={{ width: "100%", justifyContent: "space-evenly" }}>
-        <SentimentCharts stock={stock} source="news" />
-        <SentimentCharts stock={stock} />
-        <SentimentCharts stock={stock} source="reddit" />
+        <SentimentCharts
+          key={`news-${generation}`}
+          stock={stock}
+          source="news"
+        />
+        <SentimentCharts key={`tweet-${generation}`} stock={stock} />
+        <SentimentCharts
+          key={`reddit-${generation}`}
+          stock={stock}
+          source="reddit"
+        />
       </Space>
 
-      <NewsComponent stock={stock} />
-      <Tweets stock={stock} />
-      <RedditComponent stock={stock} />
+      <NewsComponent key={`news-${generation}`} stock={stock} />
+      <Tweets key={`tweets-${generation}`} stock={stock} />
+      <RedditComponent key={`reddit-${generation}`} stock={stock} />
     </Space>
   );
 };
@@ -2,6 +2,7 @@ import axios from "axios";
 import {
   PaginatedList,
   Indicator,
+  Job,
   PieValue,
   Price,
   Stock,
@@ -65,3 +66,25 @@ export function useStockIndicator(searchText: string) {
     error: error,
   };
 }
+
+export function useStockJobs(searchText: string) {
+  const { data, error } = useSWR<Job[]>(
+    searchText ? `/api/stock/${searchText}/jobs` : null,
+    fetcher,
+    {
+      // Keep polling while background ingestion for the stock is pending.
+      refreshInterval: (jobs?: Job[]) =>
+        jobs?.some((job) => job.status === "queued" || job.status === "running")
+          ? 2000
+          : 0,
+    },
+  );
+  return {
+    jobs: data,
+    pending: !!data?.some(
+      (job) => job.status === "queued" || job.status === "running"
+    ),
+    loading: !error && !data,
+    error: error,
+  };
+}
@@ -98,12 +98,25 @@ export type Reddit = {
 export type PaginatedList<T> = {
   items: T[];
   limit: number;
-  total: number;
-  page: number;
-  pages: number;
+  total: number | null;
+  page: number | null;
+  pages: number | null;
+  next_cursor: string | null;
 };
 
 export type PieValue = {
   key: string;
   value: number;
 };
+
+export type Job = {
+  id: number;
+  name: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  attempts: number;
+  max_attempts: number;
+  run_after: Date;
+  result: unknown;
+  created_at: Date;
+  updated_at: Date;
+};